@@ -13,6 +13,9 @@ admin.site.register(Application)
 admin.site.register(Interview)
 admin.site.register(Review)
 admin.site.register(Notification)
+admin.site.register(VacancyFacet)
+admin.site.register(OutboxEvent)
+admin.site.register(UnreadNotificationCounter)
 
 
 class UserProfileInline(admin.StackedInline):
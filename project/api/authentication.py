@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+logger = logging.getLogger(__name__)
+
+# Только поля для аутентификации, без пароля и личных данных; порядок - как в модели.
+# Остальные поля догружает api.roles.resolve_profile вместе с профилями
+USER_FIELDS = ['id', 'username', 'is_active']
+
+# Кэши, не видимые другим процессам: отзыв в одном процессе не дошел бы до остальных
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+_warned = False
+
+
+def _options():
+    options = {'MAX_SIZE': 10000, 'TTL': 300, 'CACHE': None, 'ALLOW_PROCESS_LOCAL': False}
+    options.update(getattr(settings, 'TOKEN_AUTH_CACHE', {}))
+    return options
+
+
+def _entry_key(key):
+    return f'auth_token:{key}'
+
+
+def _revoked_key(key):
+    return f'auth_token_revoked:{key}'
+
+
+class TokenCache:
+    """
+    LRU процесса: ключ токена -> (счетчик отзывов, значения USER_FIELDS, время создания токена)
+    с ограничением размера и времени жизни.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # ключ токена -> (запись, истекает)
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, ttl, max_size):
+        with self._lock:
+            self._entries[key] = (entry, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [key for key, (entry, _) in self._entries.items() if entry[1][0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+def get_token_cache():
+    """
+    Общий кэш из TOKEN_AUTH_CACHE['CACHE'] или None, если используется только LRU процесса.
+    Процессный кэш (LocMemCache) как общий не подходит: отзыв не дошел бы до других процессов
+    """
+    global _warned
+    options = _options()
+    if options['CACHE'] is None:
+        return None
+    backend = caches[options['CACHE']]
+    if isinstance(backend, PROCESS_LOCAL_CACHES) and not options['ALLOW_PROCESS_LOCAL']:
+        if not _warned:
+            logger.warning('Кэш "%s" не общий для процессов: токены кэшируются только в LRU процесса', options['CACHE'])
+            _warned = True
+        return None
+    return backend
+
+
+def revoke_token(key):
+    """
+    Отзывает закэшированный токен: запись удаляется из LRU процесса, а в общем кэше
+    увеличивается счетчик отзывов токена - запись с прежним значением больше не принимается
+    """
+    token_cache.discard(key)
+    backend = get_token_cache()
+    if backend is None:
+        return
+    backend.add(_revoked_key(key), 0, None)
+    try:
+        backend.incr(_revoked_key(key))
+    except ValueError:
+        # Ключ вытеснен между add и incr
+        backend.set(_revoked_key(key), 1, None)
+    backend.delete(_entry_key(key))
+
+
+def revoke_user_tokens(user_id):
+    token_cache.discard_user(user_id)
+    if get_token_cache() is None:
+        return
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        revoke_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication без запроса к БД на каждый запрос: пользователь берется из LRU
+    процесса. С общим кэшем (TOKEN_AUTH_CACHE['CACHE']) запись проверяется по счетчику
+    отзывов токена одним обращением к нему, и отзыв сразу действует во всех процессах;
+    без общего кэша - в текущем процессе сразу, в остальных через TTL (см. api/signals.py).
+    """
+
+    def authenticate_credentials(self, key):
+        options = _options()
+        backend = get_token_cache()
+        entry = token_cache.get(key)
+        revoked = 0
+
+        if backend is not None:
+            if entry is None:
+                cached = backend.get_many([_entry_key(key), _revoked_key(key)])
+                entry = cached.get(_entry_key(key))
+                revoked = cached.get(_revoked_key(key), 0)
+                if entry is not None and entry[0] == revoked:
+                    token_cache.set(key, entry, options['TTL'], options['MAX_SIZE'])
+            else:
+                revoked = backend.get(_revoked_key(key), 0)
+            if entry is not None and entry[0] != revoked:
+                entry = None
+
+        if entry is None:
+            # Счетчик прочитан до запроса к БД: отзыв во время запроса сделает запись недействительной
+            user, token = super().authenticate_credentials(key)
+            entry = (revoked, tuple(getattr(user, name) for name in USER_FIELDS), token.created)
+            token_cache.set(key, entry, options['TTL'], options['MAX_SIZE'])
+            if backend is not None:
+                backend.set(_entry_key(key), entry, options['TTL'])
+            return user, token
+
+        _, values, created = entry
+        user = User.from_db('default', USER_FIELDS, values)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        token = Token.from_db('default', ['key', 'user_id', 'created'], (key, user.pk, created))
+        token.user = user
+        return user, token
@@ -0,0 +1,260 @@
+import time
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+
+from .metrics import QueryRecorder
+from .models import Application, Category, Notification, Skill, Vacancy
+
+
+# Сценарии нагрузочного прогона: по одному на каждый маршрут api/urls.py.
+# role - от чьего имени выполняется запрос, write - запрос откатывается после выполнения,
+# files - файлы multipart-запроса {поле: (имя, содержимое)},
+# значения вида '$vacancy' подставляются из build_context()
+SCENARIOS = [
+    {'route': 'api-root', 'role': 'anonymous'},
+    {'route': 'vacancy-list', 'role': 'anonymous'},
+    {'route': 'vacancy-list', 'role': 'anonymous', 'name': 'vacancy-list-filtered',
+     'query': {'type': 'work', 'salary_band': '20000-40000'}},
+    {'route': 'vacancy-list', 'role': 'employer', 'name': 'vacancy-list-my', 'query': {'my': 'true'}},
+    {'route': 'vacancy-detail', 'role': 'anonymous', 'kwargs': {'pk': '$vacancy'}},
+    {'route': 'vacancy-search', 'role': 'anonymous', 'query': {'q': 'ассистент проект'}},
+    {'route': 'vacancy-facets', 'role': 'anonymous'},
+    {'route': 'vacancy-recommended', 'role': 'student'},
+    {'route': 'vacancy-list', 'role': 'employer', 'method': 'post', 'name': 'vacancy-create', 'write': True,
+     'data': {'title': 'Ассистент', 'description': 'Описание', 'requirements': 'Требования',
+              'vacancy_type': 'work', 'location': 'Главный корпус'}},
+    {'route': 'vacancy-detail', 'role': 'employer', 'method': 'patch', 'name': 'vacancy-update', 'write': True,
+     'kwargs': {'pk': '$vacancy'}, 'data': {'title': 'Новое название'}},
+    {'route': 'vacancy-import-vacancies', 'role': 'employer', 'method': 'post', 'write': True,
+     'files': {'file': ('vacancies.jsonl', '\n'.join(
+         '{"title": "Ассистент %d", "description": "Описание", "requirements": "Требования", '
+         '"vacancy_type": "work", "location": "Главный корпус", "skills": "Python;SQL"}' % i for i in range(50)
+     ))}},
+    {'route': 'vacancy-apply', 'role': 'student', 'method': 'post', 'write': True,
+     'kwargs': {'pk': '$open_vacancy'},
+     'data': {'resume_url': 'https://example.com/cv', 'cover_letter': 'Хочу работать у вас'}},
+    {'route': 'application-list', 'role': 'student', 'name': 'application-list-student'},
+    {'route': 'application-list', 'role': 'employer', 'name': 'application-list-employer'},
+    {'route': 'application-list', 'role': 'employer', 'name': 'application-list-ranked',
+     'query': {'vacancy': '$vacancy', 'rank': 'match'}},
+    {'route': 'application-list', 'role': 'employer', 'name': 'application-list-shallow',
+     'query': {'fields': 'id,status,student,vacancy', 'expand': ''}},
+    {'route': 'application-export', 'role': 'employer'},
+    {'route': 'application-export', 'role': 'employer', 'name': 'application-export-jsonl',
+     'query': {'export_format': 'jsonl'}},
+    {'route': 'application-detail', 'role': 'employer', 'kwargs': {'pk': '$application'}},
+    {'route': 'application-update-status', 'role': 'employer', 'method': 'patch', 'write': True,
+     'kwargs': {'pk': '$application'}, 'data': {'status': 'reviewed'}},
+    {'route': 'application-bulk-status', 'role': 'employer', 'method': 'patch', 'write': True,
+     'data': {'ids': ['$application', '$unreviewed_application'], 'status': 'reviewed'}},
+    {'route': 'application-add-review', 'role': 'employer', 'method': 'post', 'write': True,
+     'kwargs': {'pk': '$unreviewed_application'}, 'data': {'rating': 5, 'comment': 'Отлично'}},
+    {'route': 'application-create-notification', 'role': 'employer', 'method': 'post', 'write': True,
+     'kwargs': {'pk': '$application'}, 'data': {'title': 'Приглашение', 'message': 'Ждем вас'}},
+    {'route': 'category-list', 'role': 'anonymous'},
+    {'route': 'category-detail', 'role': 'anonymous', 'kwargs': {'pk': '$category'}},
+    {'route': 'skill-list', 'role': 'anonymous'},
+    {'route': 'skill-detail', 'role': 'anonymous', 'kwargs': {'pk': '$skill'}},
+    {'route': 'studentprofile-list', 'role': 'student'},
+    {'route': 'studentprofile-detail', 'role': 'student', 'kwargs': {'pk': '$student'}},
+    {'route': 'studentprofile-my-skills', 'role': 'student'},
+    {'route': 'notification-list', 'role': 'student'},
+    {'route': 'notification-detail', 'role': 'student', 'kwargs': {'pk': '$notification'}},
+    {'route': 'notification-unread-count', 'role': 'student'},
+    {'route': 'notification-mark-as-read', 'role': 'student', 'method': 'post', 'write': True,
+     'kwargs': {'pk': '$notification'}},
+    {'route': 'notification-mark-all-as-read', 'role': 'student', 'method': 'post', 'write': True},
+    {'route': 'current-user', 'role': 'student'},
+    {'route': 'dashboard', 'role': 'student', 'name': 'dashboard-student'},
+    {'route': 'dashboard', 'role': 'employer', 'name': 'dashboard-employer'},
+    {'route': 'api-metrics', 'role': 'staff'},
+    {'route': 'api-login', 'role': 'anonymous', 'method': 'post',
+     'data': {'username': '$student_username', 'password': 'password'}},
+    {'route': 'api-logout', 'role': 'student', 'method': 'post', 'write': True},
+    {'route': 'api-register', 'role': 'anonymous', 'method': 'post', 'write': True,
+     'data': {'username': 'benchmark_user', 'email': 'benchmark@example.com', 'password': 'password',
+              'role': 'student', 'first_name': 'Имя', 'last_name': 'Фамилия', 'faculty': 'ФИТ', 'course': 1}},
+    {'route': 'update-profile', 'role': 'student', 'method': 'post', 'write': True,
+     'data': {'phone': '+79000000000'}},
+]
+
+# Бесконечные потоки (SSE) не измеряются по времени ответа и не считаются непокрытыми
+STREAMING_ROUTES = {'notification-stream'}
+
+
+@contextmanager
+def rollback(enabled):
+    if not enabled:
+        yield
+        return
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def percentile(values, percent):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def api_route_names():
+    """Имена всех маршрутов из api/urls.py"""
+    names = set()
+
+    def collect(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                collect(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                names.add(pattern.name)
+
+    for pattern in get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver) and str(pattern.pattern) == 'api/':
+            collect(pattern.url_patterns)
+    return names
+
+
+def build_context():
+    """Идентификаторы реальных объектов для подстановки в сценарии"""
+    applications = Application.objects.select_related('vacancy__employer__user', 'student__user').order_by('id')
+    # Предпочитаем активную вакансию и студента с уведомлениями, чтобы детальные маршруты не отдавали 404
+    application = (
+        applications.filter(vacancy__is_active=True, student__user__notifications__isnull=False).first()
+        or applications.first()
+    )
+    if application is None:
+        raise ValueError('Нет заявок в БД: сначала выполните seed_load_data')
+
+    student = application.student
+    employer = application.vacancy.employer
+    open_vacancy = Vacancy.objects.filter(is_active=True).exclude(applications__student=student).first()
+    unreviewed = Application.objects.filter(
+        vacancy__employer=employer, review__isnull=True
+    ).values_list('id', flat=True).first()
+    notification = Notification.objects.filter(user=student.user).values_list('id', flat=True).first()
+
+    return {
+        'vacancy': application.vacancy_id,
+        'open_vacancy': open_vacancy.id if open_vacancy else application.vacancy_id,
+        'application': application.id,
+        'unreviewed_application': unreviewed or application.id,
+        'notification': notification or 0,
+        'category': Category.objects.values_list('id', flat=True).first() or 0,
+        'skill': Skill.objects.values_list('id', flat=True).first() or 0,
+        'student': student.pk,
+        'student_username': student.user.username,
+        'tokens': {
+            'student': Token.objects.get_or_create(user=student.user)[0].key,
+            'employer': Token.objects.get_or_create(user=employer.user)[0].key,
+            'staff': Token.objects.get_or_create(user=User.objects.get_or_create(
+                username='benchmark_staff', defaults={'is_staff': True}
+            )[0])[0].key,
+        },
+    }
+
+
+def _resolve(value, context):
+    # '$имя' подставляется из контекста
+    if isinstance(value, str) and value.startswith('$'):
+        return context[value[1:]]
+    if isinstance(value, list):
+        return [_resolve(item, context) for item in value]
+    return value
+
+
+def run_scenario(client, scenario, context, iterations, warmup):
+    kwargs = {key: _resolve(value, context) for key, value in scenario.get('kwargs', {}).items()}
+    query = {key: _resolve(value, context) for key, value in scenario.get('query', {}).items()}
+    data = {key: _resolve(value, context) for key, value in scenario.get('data', {}).items()}
+    path = reverse(scenario['route'], kwargs=kwargs)
+    if query:
+        path = f'{path}?{urlencode(query)}'
+
+    method = scenario.get('method', 'get')
+    headers = {}
+    if scenario['role'] != 'anonymous':
+        headers['HTTP_AUTHORIZATION'] = f"Token {context['tokens'][scenario['role']]}"
+    request_kwargs = {'data': data, 'content_type': 'application/json'} if method != 'get' else {}
+    files = scenario.get('files')
+
+    latencies, queries, sql_time, sizes, statuses = [], [], [], [], {}
+    for iteration in range(warmup + iterations):
+        recorder = QueryRecorder()
+        with rollback(scenario.get('write', False)), connection.execute_wrapper(recorder):
+            if files:
+                # Файл читается при отправке, поэтому создается заново на каждой итерации
+                request_kwargs = {'data': {**data, **{
+                    field: SimpleUploadedFile(name, content.encode()) for field, (name, content) in files.items()
+                }}}
+            started = time.perf_counter()
+            response = getattr(client, method)(path, **request_kwargs, **headers)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = time.perf_counter() - started
+        # Сессия после api-login не должна влиять на следующие сценарии
+        client.cookies.clear()
+
+        if iteration < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(recorder.count)
+        sql_time.append(recorder.duration * 1000)
+        sizes.append(size)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    return {
+        'name': scenario.get('name', scenario['route']),
+        'route': scenario['route'],
+        'method': method.upper(),
+        'path': path,
+        'role': scenario['role'],
+        'iterations': iterations,
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries': round(sum(queries) / len(queries), 2),
+        'sql_ms': round(sum(sql_time) / len(sql_time), 3),
+        'bytes': round(sum(sizes) / len(sizes)),
+    }
+
+
+def run_benchmark(iterations=20, warmup=2, host='localhost', only=None):
+    context = build_context()
+    client = Client(HTTP_HOST=host, raise_request_exception=False)
+
+    results = []
+    for scenario in SCENARIOS:
+        name = scenario.get('name', scenario['route'])
+        if only and name not in only and scenario['route'] not in only:
+            continue
+        results.append(run_scenario(client, scenario, context, iterations, warmup))
+
+    covered = {scenario['route'] for scenario in SCENARIOS} | STREAMING_ROUTES
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'warmup': warmup,
+            'rows': {
+                'vacancies': Vacancy.objects.count(),
+                'applications': Application.objects.count(),
+                'notifications': Notification.objects.count(),
+            },
+        },
+        'endpoints': results,
+        'uncovered_routes': sorted(api_route_names() - covered),
+    }
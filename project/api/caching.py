@@ -0,0 +1,56 @@
+import hashlib
+
+from django.core.cache import cache
+
+from .models import Vacancy
+from .replicas import get_config as get_replica_config, reading_from_replica
+
+
+# Поколение кэша вакансий: любое изменение вакансий, навыков, заявок
+# или категорий увеличивает его, и старые ключи перестают использоваться
+GENERATION_KEY = 'vacancy_cache_generation'
+RESPONSE_TIMEOUT = 5 * 60
+
+# Ставится при инвалидации на время задержки репликации
+RECENT_WRITE_KEY = 'vacancy_cache_recent_write'
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = 1
+        cache.add(GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate_vacancy_cache():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Ключа нет (кэш очищен) - начинаем новое поколение
+        cache.set(GENERATION_KEY, 2, None)
+    cache.set(RECENT_WRITE_KEY, True, get_replica_config()['PIN_SECONDS'])
+
+
+def replica_may_be_stale():
+    """Ответ, собранный с реплики сразу после изменения, не кэшируется: реплика могла отстать"""
+    return reading_from_replica() and cache.get(RECENT_WRITE_KEY) is not None
+
+
+def response_cache_key(request, role):
+    path = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'vacancy_response:{get_generation()}:{role}:{path}'
+
+
+def vacancy_etag(request, pk=None, *args, **kwargs):
+    """
+    ETag активной вакансии: updated_at и текущее поколение кэша.
+    Last-Modified не отдается: счетчик заявок, навыки, категория и работодатель
+    в ответе меняются без изменения updated_at, их учитывает только поколение
+    """
+    if not str(pk).isdigit():
+        return None
+    updated_at = Vacancy.objects.filter(pk=pk, is_active=True).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return f'"{pk}-{updated_at.timestamp()}-{get_generation()}"'
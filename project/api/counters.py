@@ -0,0 +1,95 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, UnreadNotificationCounter
+
+
+# Строка счетчика создается при первом чтении, создании или прочтении уведомлений
+# (удаление только уменьшает существующую строку): значение считается по таблице
+# уведомлений. Вставку, которая столкнулась с параллельной, ждет первичный ключ;
+# проигравшая сторона работает с уже созданной строкой, поэтому изменения между
+# подсчетом и вставкой не теряются.
+
+def _create(user_id, count):
+    """Создает строку счетчика; False, если ее успели создать параллельно"""
+    try:
+        with transaction.atomic():
+            UnreadNotificationCounter.objects.create(user_id=user_id, unread_count=count)
+    except IntegrityError:
+        return False
+    return True
+
+
+def _apply(deltas, create_missing=True):
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    missing = []
+    if create_missing:
+        existing = set(
+            UnreadNotificationCounter.objects.filter(user_id__in=deltas).values_list('user_id', flat=True)
+        )
+        missing = [user_id for user_id in deltas if user_id not in existing]
+    if missing:
+        # Подсчет внутри текущей транзакции уже учитывает ее изменения
+        counts = dict(
+            Notification.objects.filter(user_id__in=missing, is_read=False)
+            .values('user_id').annotate(total=Count('id'))
+            .values_list('user_id', 'total')
+        )
+        for user_id in missing:
+            if _create(user_id, counts.get(user_id, 0)):
+                del deltas[user_id]
+
+    # Одинаковые изменения применяются одним UPDATE на группу пользователей
+    by_delta = {}
+    for user_id, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(user_id)
+    for delta, user_ids in by_delta.items():
+        UnreadNotificationCounter.objects.filter(user_id__in=user_ids).update(
+            unread_count=Greatest(F('unread_count') + delta, 0)
+        )
+
+
+def notifications_created(notifications):
+    """Учитывает новые непрочитанные уведомления (одиночные и из bulk_create)"""
+    _apply(Counter(n.user_id for n in notifications if not n.is_read))
+
+
+def notifications_read(user_id, count=1):
+    """Учитывает переход count уведомлений пользователя в прочитанные"""
+    if count:
+        _apply({user_id: -count})
+
+
+def notifications_deleted(unread_by_user):
+    """
+    Учитывает удаление непрочитанных уведомлений: {id пользователя: число}.
+    Строки не создаются: при каскадном удалении пользователя его счетчик
+    может быть уже удален, а новая строка нарушила бы внешний ключ
+    """
+    _apply({user_id: -count for user_id, count in unread_by_user.items()}, create_missing=False)
+
+
+def count_unread(user_id):
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def _stored_count(user_id):
+    return UnreadNotificationCounter.objects.filter(user_id=user_id).values_list('unread_count', flat=True).first()
+
+
+def get_unread_count(user_id):
+    """Число непрочитанных уведомлений: один запрос по первичному ключу"""
+    count = _stored_count(user_id)
+    if count is not None:
+        return count
+
+    count = count_unread(user_id)
+    if _create(user_id, count):
+        return count
+    # Строку создал параллельный запрос или запись уведомлений: ее значение точнее подсчета
+    return _stored_count(user_id)
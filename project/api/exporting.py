@@ -0,0 +1,66 @@
+import csv
+import json
+
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+# Заявок в одной выборке: память ограничена одной пачкой при любом размере выгрузки
+EXPORT_CHUNK_SIZE = 2000
+
+# (колонка выгрузки, поле для values_list)
+APPLICATION_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('vacancy_id', 'vacancy_id'),
+    ('vacancy_title', 'vacancy__title'),
+    ('first_name', 'student__first_name'),
+    ('last_name', 'student__last_name'),
+    ('faculty', 'student__faculty'),
+    ('course', 'student__course'),
+    ('resume_url', 'resume_url'),
+    ('status', 'status'),
+    ('applied_at', 'applied_at'),
+    ('updated_at', 'updated_at'),
+]
+
+
+def iter_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Строки выгрузки пачками по первичному ключу. Каждая пачка - короткий
+    запрос по индексу; драйвер MySQL не буферизует всю выборку целиком.
+    """
+    lookups = [lookup for _, lookup in columns]
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list(*lookups)[:chunk_size])
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        for row in batch:
+            yield [value.isoformat() if hasattr(value, 'isoformat') else value for value in row]
+
+
+class _Echo:
+    # csv.writer пишет в объект с write(); строка сразу возвращается в поток
+    def write(self, value):
+        return value
+
+
+def _csv_safe(value):
+    # Значения от пользователей не должны выполняться как формулы в табличных редакторах
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return value
+
+
+def csv_stream(rows, columns):
+    writer = csv.writer(_Echo())
+    # Заголовок отдается до первого запроса к БД
+    yield '﻿' + writer.writerow([name for name, _ in columns])
+    for row in rows:
+        yield writer.writerow([_csv_safe(value) for value in row])
+
+
+def jsonl_stream(rows, columns):
+    names = [name for name, _ in columns]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), ensure_ascii=False) + '\n'
@@ -0,0 +1,136 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Vacancy, VacancySkill, VacancyFacet
+
+
+# Диапазоны зарплаты: (ключ, нижняя граница включительно, верхняя граница не включительно)
+SALARY_BANDS = [
+    ('0-20000', 0, 20000),
+    ('20000-40000', 20000, 40000),
+    ('40000-60000', 40000, 60000),
+    ('60000+', 60000, None),
+]
+NO_SALARY_BAND = 'none'
+
+
+def salary_band(salary):
+    if salary is None:
+        return NO_SALARY_BAND
+    for key, low, high in SALARY_BANDS:
+        if salary >= low and (high is None or salary < high):
+            return key
+    return NO_SALARY_BAND
+
+
+def field_facets(category_id, vacancy_type, location, salary):
+    """Фасеты вакансии, не связанные с навыками"""
+    facets = [
+        ('vacancy_type', vacancy_type),
+        ('location', location),
+        ('salary_band', salary_band(salary)),
+    ]
+    if category_id is not None:
+        facets.append(('category', str(category_id)))
+    return facets
+
+
+def vacancy_field_facets(vacancy):
+    return field_facets(vacancy.category_id, vacancy.vacancy_type, vacancy.location, vacancy.salary)
+
+
+def skill_facets(skill_ids):
+    return [('skill', str(skill_id)) for skill_id in skill_ids]
+
+
+def apply_deltas(deltas):
+    """Применяет изменения счетчиков атомарными F()-инкрементами"""
+    for (facet, value), delta in deltas.items():
+        if not delta:
+            continue
+        value = str(value)[:255]
+        updated = VacancyFacet.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+        if updated or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                VacancyFacet.objects.create(facet=facet, value=value, count=delta)
+        except IntegrityError:
+            # Строку успели создать параллельно
+            VacancyFacet.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def get_facet_counts():
+    """Все счетчики фасетов одним запросом"""
+    result = {facet: {} for facet, _ in VacancyFacet.FACET_CHOICES}
+    rows = VacancyFacet.objects.filter(count__gt=0).values_list('facet', 'value', 'count')
+    for facet, value, count in rows:
+        result[facet][value] = count
+    return result
+
+
+def rebuild_facets():
+    """Полностью пересчитывает счетчики по текущим данным"""
+    counts = Counter()
+    active = Vacancy.objects.filter(is_active=True)
+    for row in active.values_list('category_id', 'vacancy_type', 'location', 'salary').iterator(chunk_size=2000):
+        counts.update(field_facets(*row))
+    skill_ids = VacancySkill.objects.filter(vacancy__is_active=True).values_list('skill_id', flat=True)
+    counts.update(skill_facets(skill_ids.iterator(chunk_size=2000)))
+
+    with transaction.atomic():
+        VacancyFacet.objects.all().delete()
+        VacancyFacet.objects.bulk_create(
+            [VacancyFacet(facet=facet, value=str(value)[:255], count=count)
+             for (facet, value), count in counts.items()],
+            batch_size=1000
+        )
+
+
+def filter_vacancies(queryset, params):
+    """
+    Фильтры списка вакансий:
+    ?category=<id>, ?vacancy_type= (или ?type=), ?location=,
+    ?salary_band=<ключ из SALARY_BANDS или none>, ?with_salary=true,
+    ?skills=<id>,<id> (вакансия должна требовать все перечисленные навыки)
+    """
+    category = params.get('category')
+    if category:
+        if category.isdigit():
+            queryset = queryset.filter(category_id=int(category))
+        else:
+            queryset = queryset.filter(category__slug=category)
+
+    vacancy_type = params.get('vacancy_type') or params.get('type')
+    if vacancy_type:
+        queryset = queryset.filter(vacancy_type=vacancy_type)
+
+    location = params.get('location')
+    if location:
+        queryset = queryset.filter(location=location)
+
+    band = params.get('salary_band')
+    if band == NO_SALARY_BAND:
+        queryset = queryset.filter(salary__isnull=True)
+    elif band:
+        for key, low, high in SALARY_BANDS:
+            if key == band:
+                queryset = queryset.filter(salary__gte=low)
+                if high is not None:
+                    queryset = queryset.filter(salary__lt=high)
+                break
+
+    if params.get('with_salary') in ('true', '1'):
+        queryset = queryset.filter(salary__isnull=False)
+
+    skills = params.get('skills')
+    if skills:
+        for skill_id in skills.split(','):
+            if skill_id.strip().isdigit():
+                queryset = queryset.filter(
+                    id__in=VacancySkill.objects.filter(skill_id=int(skill_id)).values('vacancy_id')
+                )
+
+    return queryset
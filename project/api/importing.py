@@ -0,0 +1,176 @@
+import csv
+import json
+from collections import Counter
+
+from django.db import DatabaseError, connection, transaction
+
+from .caching import invalidate_vacancy_cache
+from .facets import apply_deltas, skill_facets, vacancy_field_facets
+from .models import Category, EmployerProfile, Skill, Vacancy, VacancySkill
+from .outbox import enqueue_many
+from .recommendations import skill_index
+from .search import vacancy_index
+from .serializers import VacancyImportSerializer
+
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+# Поля вакансии со списком значений (в CSV - через ';')
+VACANCY_LIST_FIELDS = ('skills',)
+
+# Вакансий в одной транзакции
+CHUNK_SIZE = 500
+
+# Ошибки сверх этого числа только считаются, чтобы отчет не рос вместе с файлом
+MAX_REPORTED_ERRORS = 1000
+
+
+def guess_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def _split_list(value):
+    return [item for item in value.split(';') if item.strip()]
+
+
+def read_rows(lines, file_format, list_fields=()):
+    """
+    Построчно читает CSV (с заголовком) или JSONL из итератора строк.
+    Возвращает (номер строки, словарь полей или None, ошибка или None).
+    Поля из list_fields в виде строки делятся по ';'.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Пустые ячейки не передаются: срабатывают значения по умолчанию модели
+            data = {key: value for key, value in row.items() if key and value not in ('', None)}
+            for field in list_fields:
+                if field in data:
+                    data[field] = _split_list(data[field])
+            yield reader.line_num, data, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Некорректный JSON: {e}'
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, 'Ожидается JSON-объект'
+            continue
+        for field in list_fields:
+            if isinstance(data.get(field), str):
+                data[field] = _split_list(data[field])
+        yield line_number, data, None
+
+
+class VacancyImporter:
+    """
+    Потоковый импорт вакансий работодателя: строки проверяются по одной,
+    вставка идет пачками по chunk_size в отдельных транзакциях, в памяти
+    держится только текущая пачка.
+    """
+
+    def __init__(self, employer, chunk_size=CHUNK_SIZE):
+        self.employer = employer
+        self.chunk_size = chunk_size
+        # Справочники загружаются один раз на весь импорт
+        self.context = {
+            'categories': self._name_map(Category.objects.values_list('name', 'slug', 'id')),
+            'skills': {name.lower(): pk for name, pk in Skill.objects.values_list('name', 'id')},
+        }
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    @staticmethod
+    def _name_map(rows):
+        names = {}
+        for name, slug, pk in rows:
+            names[slug.lower()] = pk
+            names[name.lower()] = pk
+        return names
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def run(self, rows):
+        chunk = []
+        for row, data, error in rows:
+            if error:
+                self.add_error(row, {'non_field_errors': [error]})
+                continue
+            serializer = VacancyImportSerializer(data=data, context=self.context)
+            if not serializer.is_valid():
+                self.add_error(row, serializer.errors)
+                continue
+
+            fields = dict(serializer.validated_data)
+            skill_ids = fields.pop('skills', [])
+            category_id = fields.pop('category', None)
+            chunk.append((row, Vacancy(employer=self.employer, category_id=category_id, **fields), skill_ids))
+            if len(chunk) >= self.chunk_size:
+                self.flush(chunk)
+                chunk = []
+        self.flush(chunk)
+        return self.report()
+
+    def report(self):
+        return {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+
+    def flush(self, chunk):
+        if not chunk:
+            return
+        vacancies = [vacancy for _, vacancy, _ in chunk]
+        try:
+            with transaction.atomic():
+                self._insert(vacancies)
+                VacancySkill.objects.bulk_create([
+                    VacancySkill(vacancy_id=vacancy.pk, skill_id=skill_id)
+                    for _, vacancy, skill_ids in chunk for skill_id in skill_ids
+                ], batch_size=self.chunk_size)
+
+                # bulk_create не вызывает сигналы: фасеты, outbox и индексы обновляем здесь
+                deltas = Counter()
+                for _, vacancy, skill_ids in chunk:
+                    if vacancy.is_active:
+                        deltas.update(vacancy_field_facets(vacancy))
+                        deltas.update(skill_facets(skill_ids))
+                apply_deltas(deltas)
+                enqueue_many('vacancy_created', [{'vacancy_id': vacancy.pk} for vacancy in vacancies if vacancy.is_active])
+                transaction.on_commit(lambda: self._index(chunk))
+        except DatabaseError as e:
+            for row, _, _ in chunk:
+                self.add_error(row, {'non_field_errors': [f'Ошибка БД: {e}']})
+            return
+        self.created += len(vacancies)
+
+    def _insert(self, vacancies):
+        if connection.features.can_return_rows_from_bulk_insert:
+            Vacancy.objects.bulk_create(vacancies)
+            return
+
+        # MySQL не возвращает id после bulk_create. Блокировка профиля работодателя
+        # не дает параллельному импорту вклиниться: новые строки идут после before
+        list(EmployerProfile.objects.select_for_update().filter(pk=self.employer.pk).values_list('pk'))
+        before = Vacancy.objects.filter(employer=self.employer).order_by('-pk').values_list('pk', flat=True).first()
+        Vacancy.objects.bulk_create(vacancies)
+        created = list(
+            Vacancy.objects.filter(employer=self.employer, pk__gt=before or 0)
+            .order_by('pk').values_list('pk', 'title')
+        )
+        if [title for _, title in created] != [vacancy.title for vacancy in vacancies]:
+            raise DatabaseError('Не удалось сопоставить id созданных вакансий')
+        for vacancy, (pk, _) in zip(vacancies, created):
+            vacancy.pk = pk
+
+    def _index(self, chunk):
+        for _, vacancy, _ in chunk:
+            vacancy_index.update(vacancy)
+        skill_index.add_vacancies({vacancy.pk: skill_ids for _, vacancy, skill_ids in chunk if vacancy.is_active})
+        invalidate_vacancy_cache()
@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.benchmark import run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Прогоняет все маршруты api через тестовый клиент и сохраняет p50/p95/p99, число запросов и размер ответа в JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--host', default='localhost', help='Значение заголовка Host (должно быть в ALLOWED_HOSTS)')
+        parser.add_argument('--only', nargs='*', help='Имена сценариев или маршрутов для прогона')
+        parser.add_argument('--output', default='benchmark.json', help='Файл для результатов')
+
+    def handle(self, *args, **options):
+        report = run_benchmark(
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            host=options['host'],
+            only=options['only'],
+        )
+
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+        header = f"{'Сценарий':<34} {'Статус':<10} {'p50':>8} {'p95':>8} {'p99':>8} {'SQL':>6} {'SQL мс':>8} {'Байт':>9}"
+        self.stdout.write(header)
+        for row in report['endpoints']:
+            self.stdout.write(
+                f"{row['name']:<34} {','.join(row['status_codes']):<10} "
+                f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+                f"{row['queries']:>6.1f} {row['sql_ms']:>8.2f} {row['bytes']:>9}"
+            )
+        if report['uncovered_routes']:
+            self.stdout.write(self.style.WARNING(
+                'Маршруты без сценария: ' + ', '.join(report['uncovered_routes'])
+            ))
+        self.stdout.write(self.style.SUCCESS(f"Результаты сохранены в {options['output']}"))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importing import (
+    CHUNK_SIZE, IMPORT_FORMATS, VACANCY_LIST_FIELDS, VacancyImporter, guess_format, read_rows
+)
+from api.models import EmployerProfile
+
+
+class Command(BaseCommand):
+    help = 'Потоковый импорт вакансий работодателя из CSV или JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл CSV (с заголовком) или JSONL')
+        parser.add_argument('--employer', required=True, help='Имя пользователя работодателя')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='По умолчанию определяется по расширению')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Вакансий в одной транзакции')
+
+    def handle(self, *args, **options):
+        employer = EmployerProfile.objects.filter(user__username=options['employer']).first()
+        if employer is None:
+            raise CommandError(f'Работодатель {options["employer"]} не найден')
+
+        file_format = options['format'] or guess_format(options['path'])
+        importer = VacancyImporter(employer, chunk_size=options['chunk_size'])
+        started = time.monotonic()
+        with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+            report = importer.run(read_rows(lines, file_format, VACANCY_LIST_FIELDS))
+        elapsed = time.monotonic() - started
+
+        for error in report['errors']:
+            self.stdout.write(f'Строка {error["row"]}: {error["errors"]}')
+        total = report['created'] + report['failed']
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано вакансий: {report["created"]}. Ошибок: {report["failed"]}. '
+            f'Время: {elapsed:.2f} с ({total / elapsed if elapsed else 0:.0f} строк/с)'
+        ))
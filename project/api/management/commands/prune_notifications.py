@@ -0,0 +1,114 @@
+import json
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.counters import notifications_deleted
+from api.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Удаляет устаревшие уведомления небольшими пачками по первичному ключу'
+
+    def add_arguments(self, parser):
+        retention = getattr(settings, 'NOTIFICATION_RETENTION', {})
+        parser.add_argument('--read-days', type=int, default=retention.get('READ_DAYS', 90),
+                            help='Срок хранения прочитанных уведомлений')
+        parser.add_argument('--unread-days', type=int, default=retention.get('UNREAD_DAYS', 365),
+                            help='Срок хранения непрочитанных уведомлений')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Строк в одной транзакции')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Пауза между пачками, с')
+        parser.add_argument('--archive', help='Дописать удаляемые уведомления в этот JSONL-файл')
+        parser.add_argument('--dry-run', action='store_true', help='Только посчитать, ничего не удалять')
+
+    def handle(self, *args, **options):
+        if options['read_days'] < 0 or options['unread_days'] < 0:
+            raise CommandError('Срок хранения не может быть отрицательным')
+
+        now = timezone.now()
+        read_cutoff = now - timedelta(days=options['read_days'])
+        unread_cutoff = now - timedelta(days=options['unread_days'])
+        newest_cutoff = max(read_cutoff, unread_cutoff)
+        batch_size = options['batch_size']
+        archive = open(options['archive'], 'a', encoding='utf-8') if options['archive'] else None
+
+        started = time.monotonic()
+        scanned = deleted_read = deleted_unread = 0
+        last_id = 0
+        try:
+            while True:
+                # Обход по первичному ключу от старых строк к новым: каждая пачка - диапазон кластерного индекса
+                batch = list(
+                    Notification.objects.filter(pk__gt=last_id).order_by('pk')
+                    .values_list('pk', 'user_id', 'is_read', 'created_at')[:batch_size]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                scanned += len(batch)
+
+                expired = expired_rows(batch, read_cutoff, unread_cutoff)
+                if expired and options['dry_run']:
+                    unread = sum(1 for row in expired if not row[2])
+                    deleted_unread += unread
+                    deleted_read += len(expired) - unread
+                elif expired:
+                    read, unread = self.delete([row[0] for row in expired], read_cutoff, unread_cutoff, archive)
+                    deleted_read += read
+                    deleted_unread += unread
+                    time.sleep(options['sleep'])
+
+                # Уведомления создаются по возрастанию id: дальше только строки моложе обоих сроков
+                if batch[0][3] >= newest_cutoff:
+                    break
+        finally:
+            if archive:
+                archive.close()
+
+        elapsed = time.monotonic() - started
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Просмотрено: {scanned}. {action} прочитанных: {deleted_read}, непрочитанных: {deleted_unread}. '
+            f'Время: {elapsed:.2f} с'
+        ))
+
+    def delete(self, ids, read_cutoff, unread_cutoff, archive):
+        """Удаляет пачку; возвращает число удаленных прочитанных и непрочитанных"""
+        with transaction.atomic():
+            # Строки перечитываются под блокировкой: mark_as_read между выборкой пачки
+            # и удалением уже уменьшил счетчик, и повторно уменьшать его нельзя
+            rows = expired_rows(
+                Notification.objects.select_for_update().filter(pk__in=ids).order_by('pk')
+                .values_list('pk', 'user_id', 'is_read', 'created_at'),
+                read_cutoff, unread_cutoff
+            )
+            if not rows:
+                return 0, 0
+            ids = [row[0] for row in rows]
+            unread_by_user = Counter(user_id for _, user_id, is_read, _ in rows if not is_read)
+
+            if archive:
+                for row in Notification.objects.filter(pk__in=ids).order_by('pk').values():
+                    archive.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+
+            # DELETE по списку id без загрузки объектов: QuerySet.delete() из-за сигналов
+            # Notification выбрал бы строки и обновлял счетчик на каждую
+            table = connection.ops.quote_name(Notification._meta.db_table)
+            placeholders = ', '.join(['%s'] * len(ids))
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', ids)
+            notifications_deleted(unread_by_user)
+        if archive:
+            archive.flush()
+        unread = sum(unread_by_user.values())
+        return len(ids) - unread, unread
+
+
+def expired_rows(rows, read_cutoff, unread_cutoff):
+    """Строки (id, user_id, is_read, created_at) старше срока хранения своего вида"""
+    return [row for row in rows if row[3] < (read_cutoff if row[2] else unread_cutoff)]
@@ -0,0 +1,71 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.models import Notification, UnreadNotificationCounter
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики непрочитанных уведомлений пользователей пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Пользователей в одной пачке')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать расхождения')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        started = time.monotonic()
+        checked = fixed = 0
+        last_id = 0
+
+        while True:
+            ids = list(
+                User.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+
+            stored = dict(
+                UnreadNotificationCounter.objects.filter(user_id__in=ids).values_list('user_id', 'unread_count')
+            )
+            actual = dict(
+                Notification.objects.filter(user_id__in=ids, is_read=False)
+                .values('user_id').annotate(total=Count('id'))
+                .values_list('user_id', 'total')
+            )
+            drifted = [(pk, actual.get(pk, 0)) for pk in ids if stored.get(pk) != actual.get(pk, 0)]
+            if not drifted:
+                continue
+
+            fixed += len(drifted)
+            for pk, total in drifted:
+                self.stdout.write(f'Пользователь #{pk}: unread_count -> {total}')
+            if not dry_run:
+                drifted_ids = [pk for pk, _ in drifted]
+                with transaction.atomic():
+                    # Недостающие строки вставляются пустыми, значение считает UPDATE ниже
+                    UnreadNotificationCounter.objects.bulk_create(
+                        [UnreadNotificationCounter(user_id=pk) for pk in drifted_ids if pk not in stored],
+                        ignore_conflicts=True
+                    )
+                    # Число непрочитанных считается в самом UPDATE: прочитанное выше значение
+                    # могло устареть из-за параллельных F()-изменений счетчика
+                    UnreadNotificationCounter.objects.filter(user_id__in=drifted_ids).update(
+                        unread_count=Coalesce(Subquery(
+                            Notification.objects.filter(user=OuterRef('user'), is_read=False).order_by()
+                            .values('user').annotate(total=Count('id')).values('total')
+                        ), 0)
+                    )
+
+        action = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено пользователей: {checked}. {action} расхождений: {fixed}. '
+            f'Время: {time.monotonic() - started:.2f} с'
+        ))
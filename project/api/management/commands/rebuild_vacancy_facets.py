@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики фасетов вакансий (vacancy_facet) по текущим данным'
+
+    def handle(self, *args, **options):
+        rebuild_facets()
+        self.stdout.write(self.style.SUCCESS('Счетчики фасетов пересчитаны'))
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.models import Application, Vacancy
+
+
+class Command(BaseCommand):
+    help = 'Сверяет Vacancy.applications_count с реальным числом заявок и исправляет расхождения пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Вакансий в одной пачке')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать расхождения')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        started = time.monotonic()
+        checked = fixed = 0
+        last_id = 0
+
+        while True:
+            # Обход по первичному ключу: каждая пачка - короткий запрос по индексу
+            batch = list(
+                Vacancy.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', 'applications_count')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            checked += len(batch)
+
+            ids = [pk for pk, _ in batch]
+            actual = dict(
+                Application.objects.filter(vacancy_id__in=ids)
+                .values('vacancy_id').annotate(total=Count('id'))
+                .values_list('vacancy_id', 'total')
+            )
+            drifted = [(pk, actual.get(pk, 0)) for pk, stored in batch if stored != actual.get(pk, 0)]
+            if not drifted:
+                continue
+
+            fixed += len(drifted)
+            for pk, total in drifted:
+                self.stdout.write(f'Вакансия #{pk}: applications_count -> {total}')
+            if not dry_run:
+                # Число заявок считается в самом UPDATE: прочитанное выше значение могло
+                # устареть из-за параллельных F('applications_count') + 1 из сигналов
+                Vacancy.objects.filter(pk__in=[pk for pk, _ in drifted]).update(
+                    applications_count=Coalesce(Subquery(
+                        Application.objects.filter(vacancy=OuterRef('pk')).order_by()
+                        .values('vacancy').annotate(total=Count('id')).values('total')
+                    ), 0)
+                )
+
+        action = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено вакансий: {checked}. {action} расхождений: {fixed}. '
+            f'Время: {time.monotonic() - started:.2f} с'
+        ))
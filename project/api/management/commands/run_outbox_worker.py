@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.outbox import process_batch, process_fanout_chunk
+from api.realtime import check_shared_broker
+
+
+class Command(BaseCommand):
+    help = 'Фоновый воркер: разворачивает события outbox в уведомления пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--fanout-chunk-size', type=int, default=1000, help='Получателей рассылки в одной транзакции')
+        parser.add_argument('--interval', type=float, default=1.0, help='Пауза в секундах, когда событий нет')
+        parser.add_argument('--once', action='store_true', help='Обработать очередь и завершиться')
+
+    def handle(self, *args, **options):
+        check_shared_broker()
+
+        total = 0
+        while True:
+            processed = process_batch(options['batch_size'])
+            total += processed
+            if processed:
+                self.stdout.write(f'Обработано событий: {processed}')
+                continue
+
+            # Рассылки идут, только когда очередь событий по заявкам пуста
+            created = process_fanout_chunk(options['fanout_chunk_size'])
+            if created is not None:
+                self.stdout.write(f'Рассылка: создано уведомлений: {created}')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Всего обработано событий: {total}'))
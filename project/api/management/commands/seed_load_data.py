@@ -0,0 +1,228 @@
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.facets import rebuild_facets
+from api.recommendations import invalidate_skill_index
+from api.models import (
+    StudentProfile, EmployerProfile, Category, Skill, Vacancy, VacancySkill,
+    StudentSkill, Application, Notification
+)
+
+
+CATEGORIES = [
+    ('ИТ', 'it'), ('Наука', 'science'), ('Библиотека', 'library'), ('Спорт', 'sport'),
+    ('Администрация', 'administration'), ('Общежитие', 'dormitory'), ('Столовая', 'canteen'),
+    ('Мероприятия', 'events'), ('Лаборатории', 'labs'), ('Приемная комиссия', 'admissions'),
+]
+
+SKILLS = [
+    'Python', 'Java', 'JavaScript', 'SQL', 'Django', 'React', 'Excel', 'Word', 'Photoshop',
+    'Figma', 'Английский язык', 'Немецкий язык', 'Коммуникабельность', 'Работа с клиентами',
+    'Бухгалтерия', 'Маркетинг', 'SMM', 'Копирайтинг', 'Фотография', 'Видеомонтаж',
+    'Linux', 'Docker', 'Git', 'C++', 'Go', 'Анализ данных', 'Статистика', 'Химия',
+    'Биология', 'Физика', 'Преподавание', 'Организация мероприятий', 'Продажи', 'Логистика',
+    '1С', 'Дизайн', 'UX', 'Тестирование', 'Сети', 'Поддержка пользователей',
+]
+
+FACULTIES = ['ФИТ', 'Экономический', 'Физический', 'Химический', 'Филологический', 'Юридический']
+LOCATIONS = ['Главный корпус', 'Корпус Б', 'Библиотека', 'Общежитие №1', 'Удаленно', 'Технопарк']
+WORDS = [
+    'помощник', 'ассистент', 'лаборант', 'разработчик', 'администратор', 'консультант',
+    'аналитик', 'оператор', 'волонтер', 'стажер', 'проект', 'данные', 'кафедра', 'студенты',
+    'отчеты', 'поддержка', 'сайт', 'мероприятие', 'исследование', 'документы',
+]
+
+
+class Command(BaseCommand):
+    help = 'Генерирует реалистичный набор данных для нагрузочного тестирования api'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50000)
+        parser.add_argument('--employers', type=int, default=5000)
+        parser.add_argument('--vacancies', type=int, default=20000)
+        parser.add_argument('--applications', type=int, default=500000)
+        parser.add_argument('--notifications', type=int, default=2000000)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--prefix', default='seed', help='Префикс имен пользователей')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора случайных чисел')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        # Один хэш на всех: PBKDF2 для каждого пользователя занял бы часы
+        self.password = make_password('password')
+        started = time.monotonic()
+
+        categories = self.create_categories()
+        skills = self.create_skills()
+        employer_ids = self.create_users('employer', options['employers'], EmployerProfile, self.employer_profile)
+        student_ids = self.create_users('student', options['students'], StudentProfile, self.student_profile)
+        self.create_student_skills(student_ids, skills)
+        vacancy_ids = self.create_vacancies(options['vacancies'], employer_ids, categories, skills)
+        self.create_applications(options['applications'], student_ids, vacancy_ids)
+        self.create_notifications(options['notifications'], student_ids + employer_ids)
+
+        # bulk_create не вызывает сигналы: пересчитываем денормализованные данные
+        call_command('reconcile_applications_count', stdout=self.stdout)
+        call_command('rebuild_unread_counters', stdout=self.stdout)
+        rebuild_facets()
+        invalidate_skill_index()
+
+        self.stdout.write(self.style.SUCCESS(f'Готово за {time.monotonic() - started:.1f} с'))
+
+    def log(self, message):
+        self.stdout.write(message)
+
+    def chunks(self, items):
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
+
+    def bulk_create(self, model, objects):
+        for chunk in self.chunks(objects):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=self.batch_size)
+
+    def create_categories(self):
+        for name, slug in CATEGORIES:
+            Category.objects.get_or_create(slug=slug, defaults={'name': name})
+        return list(Category.objects.values_list('id', flat=True))
+
+    def create_skills(self):
+        for name in SKILLS:
+            Skill.objects.get_or_create(name=name)
+        return list(Skill.objects.values_list('id', flat=True))
+
+    def employer_profile(self, user_id, index):
+        return EmployerProfile(
+            user_id=user_id,
+            first_name=f'Имя{index}',
+            last_name=f'Фамилия{index}',
+            company_name=f'Подразделение {index}',
+            department=self.random.choice(FACULTIES),
+            contact_person=f'Контакт {index}',
+            phone=f'+7900{index:07d}',
+        )
+
+    def student_profile(self, user_id, index):
+        return StudentProfile(
+            user_id=user_id,
+            first_name=f'Студент{index}',
+            last_name=f'Фамилия{index}',
+            faculty=self.random.choice(FACULTIES),
+            course=self.random.randint(1, 6),
+            resume_url=f'https://example.com/resume/{index}',
+        )
+
+    def create_users(self, role, count, profile_model, build_profile):
+        self.log(f'Пользователи ({role}): {count}')
+        user_ids = []
+        for start in range(0, count, self.batch_size):
+            indexes = range(start, min(start + self.batch_size, count))
+            usernames = [f'{self.prefix}_{role}_{index}' for index in indexes]
+            with transaction.atomic():
+                User.objects.bulk_create([
+                    User(username=username, email=f'{username}@example.com', password=self.password)
+                    for username in usernames
+                ])
+                # MySQL не возвращает id после bulk_create
+                ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+                profile_model.objects.bulk_create(
+                    [build_profile(ids[username], index) for username, index in zip(usernames, indexes)]
+                )
+            user_ids.extend(ids[username] for username in usernames)
+        return user_ids
+
+    def create_student_skills(self, student_ids, skills):
+        self.log('Навыки студентов')
+        rows = []
+        for student_id in student_ids:
+            for skill_id in self.random.sample(skills, self.random.randint(2, 6)):
+                rows.append(StudentSkill(student_id=student_id, skill_id=skill_id))
+            if len(rows) >= self.batch_size:
+                self.bulk_create(StudentSkill, rows)
+                rows = []
+        self.bulk_create(StudentSkill, rows)
+
+    def create_vacancies(self, count, employer_ids, categories, skills):
+        self.log(f'Вакансии: {count}')
+        if not employer_ids:
+            return []
+        before = Vacancy.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        for start in range(0, count, self.batch_size):
+            vacancies = []
+            for _ in range(start, min(start + self.batch_size, count)):
+                words = self.random.sample(WORDS, 6)
+                salary = self.random.choice([None, 15000, 25000, 35000, 45000, 55000, 70000])
+                vacancies.append(Vacancy(
+                    employer_id=self.random.choice(employer_ids),
+                    title=' '.join(words[:2]).capitalize(),
+                    description=' '.join(self.random.choices(WORDS, k=40)),
+                    requirements=' '.join(self.random.choices(WORDS, k=15)),
+                    vacancy_type=self.random.choice(['work', 'internship']),
+                    salary=Decimal(salary) if salary is not None else None,
+                    location=self.random.choice(LOCATIONS),
+                    is_active=self.random.random() < 0.9,
+                    category_id=self.random.choice(categories),
+                ))
+            with transaction.atomic():
+                Vacancy.objects.bulk_create(vacancies)
+
+        vacancy_ids = list(Vacancy.objects.filter(id__gt=before).values_list('id', flat=True))
+        rows = []
+        for vacancy_id in vacancy_ids:
+            for skill_id in self.random.sample(skills, self.random.randint(2, 5)):
+                rows.append(VacancySkill(vacancy_id=vacancy_id, skill_id=skill_id))
+            if len(rows) >= self.batch_size:
+                self.bulk_create(VacancySkill, rows)
+                rows = []
+        self.bulk_create(VacancySkill, rows)
+        return vacancy_ids
+
+    def create_applications(self, count, student_ids, vacancy_ids):
+        self.log(f'Заявки: {count}')
+        if not student_ids or not vacancy_ids:
+            return
+        per_student, extra = divmod(count, len(student_ids))
+        statuses = ['pending', 'pending', 'reviewed', 'accepted', 'rejected']
+        rows = []
+        for position, student_id in enumerate(student_ids):
+            total = min(per_student + (1 if position < extra else 0), len(vacancy_ids))
+            for vacancy_id in self.random.sample(vacancy_ids, total):
+                rows.append(Application(
+                    student_id=student_id,
+                    vacancy_id=vacancy_id,
+                    resume_url=f'https://example.com/resume/{student_id}',
+                    cover_letter='Здравствуйте! Хочу работать у вас.',
+                    status=self.random.choice(statuses),
+                ))
+            if len(rows) >= self.batch_size:
+                self.bulk_create(Application, rows)
+                rows = []
+        self.bulk_create(Application, rows)
+
+    def create_notifications(self, count, user_ids):
+        self.log(f'Уведомления: {count}')
+        if not user_ids:
+            return
+        types = ['application_update', 'new_vacancy', 'system']
+        for start in range(0, count, self.batch_size):
+            rows = [
+                Notification(
+                    user_id=self.random.choice(user_ids),
+                    title='Уведомление',
+                    message='Статус вашей заявки изменен',
+                    notification_type=self.random.choice(types),
+                    is_read=self.random.random() < 0.7,
+                )
+                for _ in range(start, min(start + self.batch_size, count))
+            ]
+            with transaction.atomic():
+                Notification.objects.bulk_create(rows)
@@ -0,0 +1,269 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+
+# Границы корзин гистограммы времени ответа, секунды
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Прочие методы попадают в 'OTHER', чтобы клиент не мог раздуть число рядов
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+# Раскладка значений маршрута: корзины (последняя - +Inf), затем суммы
+SUM, QUERIES, QUERY_DURATION, SIZE = range(len(DURATION_BUCKETS) + 1, len(DURATION_BUCKETS) + 5)
+STATS_SIZE = len(DURATION_BUCKETS) + 5
+
+FILE_PREFIX = 'api_metrics_'
+
+
+class QueryRecorder:
+    """Считает запросы к БД и их суммарное время через connection.execute_wrapper"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def install_query_wrapper(wrapper):
+    """
+    Ставит execute_wrapper на соединения текущего потока без контекстного менеджера.
+    Под ASGI синхронное представление работает в другом потоке со своими соединениями:
+    обертка ставится из process_view (он вызывается в потоке представления),
+    а снимается в __acall__ после ответа.
+    """
+    installed = list(connections.all())
+    for connection in installed:
+        connection.execute_wrappers.append(wrapper)
+    return installed
+
+
+def remove_query_wrapper(installed, wrapper):
+    for connection in installed:
+        connection.execute_wrappers.remove(wrapper)
+
+
+class MetricsRegistry:
+    """
+    Метрики запросов одного процесса.
+    Каждый поток пишет только в свою копию словарей, поэтому запись идет без блокировок;
+    копии складываются при выгрузке. Для нескольких процессов (gunicorn, uwsgi)
+    каждый процесс периодически сбрасывает снимок в файл в METRICS['DIR'],
+    а /api/metrics складывает файлы всех процессов.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        # Берется только при появлении нового потока
+        self._lock = threading.Lock()
+        self._flushed_at = 0.0
+
+    def reset(self):
+        # После fork дочерний процесс начинает со своих нулей
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self._flushed_at = 0.0
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = ({}, {})
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, route, method, status, duration, queries=0, query_duration=0.0, size=0):
+        routes, statuses = self._shard()
+        key = (route, method)
+        stats = routes.get(key)
+        if stats is None:
+            stats = routes[key] = [0] * STATS_SIZE
+        stats[bisect_left(DURATION_BUCKETS, duration)] += 1
+        stats[SUM] += duration
+        stats[QUERIES] += queries
+        stats[QUERY_DURATION] += query_duration
+        stats[SIZE] += size
+        status_key = (route, method, status)
+        statuses[status_key] = statuses.get(status_key, 0) + 1
+
+    def snapshot(self):
+        """Сумма по всем потокам: ({(маршрут, метод): значения}, {(маршрут, метод, статус): число})"""
+        routes, statuses = {}, {}
+        for shard_routes, shard_statuses in list(self._shards):
+            for key, stats in list(shard_routes.items()):
+                _add(routes, key, list(stats))
+            for key, count in list(shard_statuses.items()):
+                statuses[key] = statuses.get(key, 0) + count
+        return routes, statuses
+
+    def flush(self, directory):
+        """Атомарно записывает снимок процесса в файл каталога метрик"""
+        routes, statuses = self.snapshot()
+        data = {
+            'routes': [[*key, stats] for key, stats in routes.items()],
+            'statuses': [[*key, count] for key, count in statuses.items()],
+        }
+        path = os.path.join(directory, f'{FILE_PREFIX}{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(data, file)
+        os.replace(temporary, path)
+        self._flushed_at = time.monotonic()
+
+    def maybe_flush(self):
+        config = get_config()
+        if config['DIR'] and time.monotonic() - self._flushed_at >= config['FLUSH_INTERVAL']:
+            self.flush(config['DIR'])
+
+    def collect(self):
+        """Метрики всех процессов (или только текущего, если каталог не задан)"""
+        directory = get_config()['DIR']
+        if not directory:
+            return self.snapshot()
+        self.flush(directory)
+        routes, statuses = {}, {}
+        for path in glob.glob(os.path.join(directory, f'{FILE_PREFIX}*.json')):
+            try:
+                with open(path) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for route, method, stats in data['routes']:
+                _add(routes, (route, method), stats)
+            for route, method, status, count in data['statuses']:
+                statuses[(route, method, status)] = statuses.get((route, method, status), 0) + count
+        return routes, statuses
+
+
+def _add(routes, key, stats):
+    total = routes.get(key)
+    if total is None:
+        routes[key] = stats
+    else:
+        for index, value in enumerate(stats):
+            total[index] += value
+
+
+def get_config():
+    return {'DIR': None, 'FLUSH_INTERVAL': 5, **getattr(settings, 'METRICS', {})}
+
+
+registry = MetricsRegistry()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry.reset)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_label(value)}"' for name, value in labels.items())
+
+
+def render_prometheus(routes, statuses):
+    """Текстовый формат Prometheus 0.0.4"""
+    lines = [
+        '# HELP api_request_duration_seconds Время обработки запроса',
+        '# TYPE api_request_duration_seconds histogram',
+    ]
+    for (route, method), stats in sorted(routes.items()):
+        labels = _labels(route=route, method=method)
+        cumulative = 0
+        for bound, count in zip((*DURATION_BUCKETS, '+Inf'), stats):
+            cumulative += count
+            lines.append(f'api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'api_request_duration_seconds_sum{{{labels}}} {stats[SUM]}')
+        lines.append(f'api_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+    lines += ['# HELP api_requests_total Число запросов по кодам ответа', '# TYPE api_requests_total counter']
+    for (route, method, status), count in sorted(statuses.items()):
+        lines.append(f'api_requests_total{{{_labels(route=route, method=method, status=status)}}} {count}')
+
+    for name, index, help_text in (
+        ('api_db_queries_total', QUERIES, 'Число запросов к БД'),
+        ('api_db_query_duration_seconds_total', QUERY_DURATION, 'Суммарное время запросов к БД'),
+        ('api_response_size_bytes_total', SIZE, 'Суммарный размер ответов (без потоковых)'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (route, method), stats in sorted(routes.items()):
+            lines.append(f'{name}{{{_labels(route=route, method=method)}}} {stats[index]}')
+    return '\n'.join(lines) + '\n'
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Записывает время ответа, число и время запросов к БД, размер и код ответа
+    по имени маршрута. Ставится первым в MIDDLEWARE.
+    Под ASGI запросы к БД считаются с process_view до конца ответа.
+    Для потоковых ответов измеряется время до начала ответа, размер не учитывается.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = request._metrics_recorder = QueryRecorder()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            installed = getattr(request, '_metrics_connections', None)
+            if installed is not None:
+                remove_query_wrapper(installed, recorder)
+        self.record(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Только под ASGI: в синхронном режиме обертка уже стоит в __call__.
+        # Запросы до process_view (в других потоках) не считаются
+        recorder = getattr(request, '_metrics_recorder', None)
+        if recorder is not None and not hasattr(request, '_metrics_connections'):
+            request._metrics_connections = install_query_wrapper(recorder)
+
+    def record(self, request, response, duration, recorder):
+        method = request.method if request.method in KNOWN_METHODS else 'OTHER'
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(
+            route_name(request), method, response.status_code, duration,
+            recorder.count, recorder.duration, size
+        )
+        registry.maybe_flush()
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+# Индекс FULLTEXT есть только в MySQL, на остальных бэкендах
+# поиск работает через api.search.VacancySearchIndex
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'ALTER TABLE vacancy ADD FULLTEXT INDEX vacancy_fulltext_idx '
+            '(title, description, requirements)'
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE vacancy DROP INDEX vacancy_fulltext_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:03
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# Копия диапазонов api.facets.SALARY_BANDS на момент миграции: миграция не зависит
+# от текущего кода приложения
+SALARY_BANDS = [
+    ('0-20000', 0, 20000),
+    ('20000-40000', 20000, 40000),
+    ('40000-60000', 40000, 60000),
+    ('60000+', 60000, None),
+]
+
+
+def salary_band(salary):
+    if salary is None:
+        return 'none'
+    for key, low, high in SALARY_BANDS:
+        if salary >= low and (high is None or salary < high):
+            return key
+    return 'none'
+
+
+def populate_facets(apps, schema_editor):
+    # Начальное заполнение счетчиков; дальше их поддерживают сигналы api.signals
+    Vacancy = apps.get_model('api', 'Vacancy')
+    VacancySkill = apps.get_model('api', 'VacancySkill')
+    VacancyFacet = apps.get_model('api', 'VacancyFacet')
+
+    counts = Counter()
+    rows = Vacancy.objects.filter(is_active=True).values_list('category_id', 'vacancy_type', 'location', 'salary')
+    for category_id, vacancy_type, location, salary in rows.iterator(chunk_size=2000):
+        counts[('vacancy_type', vacancy_type)] += 1
+        counts[('location', location)] += 1
+        counts[('salary_band', salary_band(salary))] += 1
+        if category_id is not None:
+            counts[('category', str(category_id))] += 1
+    skill_ids = VacancySkill.objects.filter(vacancy__is_active=True).values_list('skill_id', flat=True)
+    for skill_id in skill_ids.iterator(chunk_size=2000):
+        counts[('skill', str(skill_id))] += 1
+
+    VacancyFacet.objects.bulk_create(
+        [VacancyFacet(facet=facet, value=str(value)[:255], count=count) for (facet, value), count in counts.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_vacancy_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('category', 'Категория'), ('vacancy_type', 'Тип вакансии'), ('location', 'Местоположение'), ('salary_band', 'Диапазон зарплаты'), ('skill', 'Навык')], max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'vacancy_facet',
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facets, migrations.RunPython.noop),
+    ]
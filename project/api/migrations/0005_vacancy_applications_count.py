@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_applications_count(apps, schema_editor):
+    Vacancy = apps.get_model('api', 'Vacancy')
+    Application = apps.get_model('api', 'Application')
+    counts = Application.objects.filter(vacancy=OuterRef('pk')).values('vacancy').annotate(
+        total=Count('id')
+    ).values('total')
+    Vacancy.objects.update(applications_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_vacancy_facet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_applications_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_vacancy_applications_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('application_created', 'Новая заявка'), ('application_status_changed', 'Статус заявки изменен'), ('review_added', 'Добавлен отзыв')], max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'outbox_event',
+                'indexes': [models.Index(fields=['processed_at', 'id'], name='outbox_even_process_b9e964_idx')],
+            },
+        ),
+    ]
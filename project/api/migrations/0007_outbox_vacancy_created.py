@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_outbox_event'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='event_type',
+            field=models.CharField(choices=[('application_created', 'Новая заявка'), ('application_status_changed', 'Статус заявки изменен'), ('review_added', 'Добавлен отзыв'), ('vacancy_created', 'Новая вакансия')], max_length=50),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_unread_notification_counter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentskill',
+            index=models.Index(fields=['skill', 'student'], name='student_ski_skill_i_5e897b_idx'),
+        ),
+    ]
@@ -96,6 +96,8 @@ class Vacancy(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    # Денормализованное число заявок, поддерживается сигналами Application (см. api/signals.py)
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
 
     skills = models.ManyToManyField(Skill, through='VacancySkill')
 
@@ -104,8 +106,19 @@ class Vacancy(models.Model):
         indexes = [
             models.Index(fields=['is_active']),
             models.Index(fields=['vacancy_type']),
+            models.Index(fields=['created_at', 'id']),
         ]
 
+    def save(self, *args, **kwargs):
+        # Полное сохранение не пишет applications_count: значение в объекте могло
+        # устареть, пока сигналы заявок меняли счетчик через F()
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'applications_count'
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
@@ -131,6 +144,10 @@ class StudentSkill(models.Model):
     class Meta:
         db_table = 'student_skill'
         unique_together = ['student', 'skill']
+        indexes = [
+            # Рассылка о новой вакансии: студенты по навыку без чтения строк таблицы
+            models.Index(fields=['skill', 'student']),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.skill.name}"
@@ -158,6 +175,7 @@ class Application(models.Model):
         unique_together = ['student', 'vacancy']
         indexes = [
             models.Index(fields=['status']),
+            models.Index(fields=['applied_at', 'id']),
         ]
 
     def __str__(self):
@@ -225,7 +243,67 @@ class Notification(models.Model):
         db_table = 'notification'
         indexes = [
             models.Index(fields=['user', 'is_read']),
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+# 12. Счетчики фасетов активных вакансий (поддерживаются сигналами, см. api/facets.py)
+class VacancyFacet(models.Model):
+    FACET_CHOICES = [
+        ('category', 'Категория'),
+        ('vacancy_type', 'Тип вакансии'),
+        ('location', 'Местоположение'),
+        ('salary_band', 'Диапазон зарплаты'),
+        ('skill', 'Навык'),
+    ]
+
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'vacancy_facet'
+        unique_together = ['facet', 'value']
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+# 13. Событие транзакционного outbox (обрабатывается командой run_outbox_worker)
+class OutboxEvent(models.Model):
+    EVENT_TYPE_CHOICES = [
+        ('application_created', 'Новая заявка'),
+        ('application_status_changed', 'Статус заявки изменен'),
+        ('review_added', 'Добавлен отзыв'),
+        ('vacancy_created', 'Новая вакансия'),
+    ]
+
+    event_type = models.CharField(max_length=50, choices=EVENT_TYPE_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'outbox_event'
+        indexes = [
+            models.Index(fields=['processed_at', 'id']),
         ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.event_type} #{self.id}"
+
+
+# 14. Счетчик непрочитанных уведомлений пользователя (поддерживается api.counters)
+class UnreadNotificationCounter(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'notification_unread_counter'
+
+    def __str__(self):
+        return f"{self.user}: {self.unread_count}"
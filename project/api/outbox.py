@@ -0,0 +1,201 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import notifications_created
+from .realtime import publish_notifications
+from .models import Application, Notification, OutboxEvent, StudentSkill, Vacancy, VacancySkill
+
+
+# После стольких неудачных попыток событие больше не выбирается воркером
+MAX_ATTEMPTS = 5
+
+STATUS_DISPLAY = dict(Application.STATUS_CHOICES)
+
+
+def enqueue(event_type, **payload):
+    """
+    Записывает событие в outbox. Вызывается в той же транзакции, что и
+    изменение данных, поэтому событие не теряется и не появляется без изменения.
+    """
+    return OutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def enqueue_many(event_type, payloads):
+    """Пакетный enqueue: все события одним INSERT"""
+    return OutboxEvent.objects.bulk_create(
+        [OutboxEvent(event_type=event_type, payload=payload) for payload in payloads]
+    )
+
+
+def create_notifications(notifications, batch_size=500):
+    """Единая точка массового создания уведомлений"""
+    created = Notification.objects.bulk_create(notifications, batch_size=batch_size)
+    notifications_created(created)
+    # bulk_create не вызывает post_save: подписчиков оповещаем здесь, после коммита
+    transaction.on_commit(lambda: publish_notifications(created))
+    return created
+
+
+def _load_applications(events):
+    ids = {event.payload.get('application_id') for event in events}
+    applications = Application.objects.filter(id__in=ids).select_related(
+        'student', 'vacancy__employer'
+    ).only(
+        'id', 'student__user', 'student__first_name',
+        'vacancy__title', 'vacancy__employer__user'
+    )
+    return {application.id: application for application in applications}
+
+
+def _application_created(event, application):
+    return Notification(
+        user_id=application.vacancy.employer.user_id,
+        title='Новая заявка',
+        message=f'Студент {application.student.first_name} откликнулся на вакансию "{application.vacancy.title}"',
+        notification_type='new_application'
+    )
+
+
+def _application_status_changed(event, application):
+    status_display = STATUS_DISPLAY.get(event.payload.get('status'), event.payload.get('status'))
+    return Notification(
+        user_id=application.student.user_id,
+        title='Обновление статуса заявки',
+        message=f'Статус вашей заявки на вакансию "{application.vacancy.title}" изменен на "{status_display}"',
+        notification_type='application_update'
+    )
+
+
+def _review_added(event, application):
+    return Notification(
+        user_id=application.student.user_id,
+        title='Новый отзыв на вашу заявку',
+        message=f'Работодатель оставил отзыв на вашу заявку на вакансию "{application.vacancy.title}"',
+        notification_type='application_update'
+    )
+
+
+# Обработчики событий о заявках: (событие, заявка) -> Notification
+APPLICATION_EVENT_HANDLERS = {
+    'application_created': _application_created,
+    'application_status_changed': _application_status_changed,
+    'review_added': _review_added,
+}
+
+
+def process_batch(batch_size=500):
+    """
+    Разворачивает пачку необработанных событий в уведомления.
+    Возвращает число обработанных событий.
+    """
+    with transaction.atomic():
+        # skip_locked позволяет запускать несколько воркеров параллельно
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS,
+                    event_type__in=APPLICATION_EVENT_HANDLERS)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        applications = _load_applications(events)
+        notifications = []
+        done = []
+        failed = []
+        for event in events:
+            try:
+                handler = APPLICATION_EVENT_HANDLERS[event.event_type]
+                application = applications.get(event.payload.get('application_id'))
+                # Заявку могли удалить до обработки события - уведомлять не о чем
+                if application is not None:
+                    notifications.append(handler(event, application))
+                done.append(event.id)
+            except Exception as e:
+                event.attempts += 1
+                event.last_error = f'{type(e).__name__}: {e}'
+                failed.append(event)
+
+        create_notifications(notifications)
+        OutboxEvent.objects.filter(id__in=done).update(processed_at=timezone.now())
+        if failed:
+            OutboxEvent.objects.bulk_update(failed, ['attempts', 'last_error'])
+
+    return len(done)
+
+
+def _vacancy_fanout(event, chunk_size):
+    """
+    Одна порция рассылки о новой вакансии: следующие chunk_size студентов,
+    у которых есть хотя бы один навык вакансии. Поиск идет по индексу
+    student_skill.skill_id (навык -> студенты). Возвращает (уведомления, новый курсор)
+    или (уведомления, None), когда рассылка завершена.
+    """
+    vacancy = Vacancy.objects.filter(
+        pk=event.payload.get('vacancy_id'), is_active=True
+    ).only('id', 'title').first()
+    if vacancy is None:
+        return [], None
+
+    skill_ids = list(VacancySkill.objects.filter(vacancy=vacancy).values_list('skill_id', flat=True))
+    if not skill_ids:
+        return [], None
+
+    cursor = event.payload.get('cursor', 0)
+    student_ids = list(
+        StudentSkill.objects.filter(skill_id__in=skill_ids, student_id__gt=cursor)
+        .order_by('student_id').values_list('student_id', flat=True).distinct()[:chunk_size]
+    )
+    notifications = [
+        Notification(
+            user_id=student_id,
+            title='Новая вакансия',
+            message=f'Появилась вакансия "{vacancy.title}", подходящая под ваши навыки',
+            notification_type='new_vacancy'
+        )
+        for student_id in student_ids
+    ]
+    if len(student_ids) < chunk_size:
+        return notifications, None
+    return notifications, student_ids[-1]
+
+
+# Рассылки, которые выполняются порциями в отдельных коротких транзакциях
+FANOUT_EVENT_HANDLERS = {
+    'vacancy_created': _vacancy_fanout,
+}
+
+
+def process_fanout_chunk(chunk_size=1000):
+    """
+    Обрабатывает одну порцию самой старой незавершенной рассылки.
+    Курсор сохраняется в payload вместе с созданными уведомлениями,
+    поэтому прерванная рассылка продолжается без дублей.
+    Возвращает число созданных уведомлений или None, если рассылок нет.
+    """
+    with transaction.atomic():
+        event = (
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS,
+                    event_type__in=FANOUT_EVENT_HANDLERS)
+            .order_by('id').first()
+        )
+        if event is None:
+            return None
+
+        try:
+            notifications, cursor = FANOUT_EVENT_HANDLERS[event.event_type](event, chunk_size)
+        except Exception as e:
+            event.attempts += 1
+            event.last_error = f'{type(e).__name__}: {e}'
+            event.save(update_fields=['attempts', 'last_error'])
+            return 0
+
+        create_notifications(notifications)
+        if cursor is None:
+            event.processed_at = timezone.now()
+        else:
+            event.payload['cursor'] = cursor
+        event.save(update_fields=['payload', 'processed_at'])
+
+    return len(notifications)
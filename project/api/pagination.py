@@ -0,0 +1,31 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class BaseCursorPagination(CursorPagination):
+    """
+    Keyset-пагинация: курсор кодирует позицию по индексированному ключу
+    сортировки, поэтому стоимость страницы не зависит от глубины прокрутки,
+    а вставка новых строк не сдвигает уже выданные страницы
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class VacancyCursorPagination(BaseCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class ApplicationCursorPagination(BaseCursorPagination):
+    ordering = ('-applied_at', '-id')
+
+
+class NotificationCursorPagination(BaseCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class CandidateRankPagination(PageNumberPagination):
+    """Постраничный вывод кандидатов, отсортированных по оценке в памяти"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from .models import StudentProfile
+from .serializers import StudentRosterSerializer
+
+
+# Студентов в одной транзакции
+BATCH_SIZE = 1000
+
+# Ошибки сверх этого числа только считаются
+MAX_REPORTED_ERRORS = 1000
+
+PROFILE_FIELDS = ['first_name', 'last_name', 'faculty', 'course', 'phone', 'resume_url']
+
+
+class StudentProvisioner:
+    """
+    Массовое создание студентов: пользователь, профиль и токен.
+    Уникальность имен и email проверяется одним запросом на пачку, пароли
+    хэшируются параллельно в пуле процессов (PBKDF2 - основная стоимость).
+    Каждая пачка - отдельная транзакция, уже существующие имена пропускаются,
+    поэтому прерванный запуск можно просто повторить.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, workers=None):
+        self.batch_size = batch_size
+        # workers=0 - хэширование в текущем процессе
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+        self.seen_emails = set()
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def run(self, rows):
+        try:
+            batch = []
+            for row, data, error in rows:
+                if error:
+                    self.add_error(row, {'non_field_errors': [error]})
+                    continue
+                serializer = StudentRosterSerializer(data=data)
+                if not serializer.is_valid():
+                    self.add_error(row, serializer.errors)
+                    continue
+                batch.append((row, serializer.validated_data))
+                if len(batch) >= self.batch_size:
+                    self.flush(batch)
+                    batch = []
+            self.flush(batch)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+        return self.report()
+
+    def report(self):
+        return {'created': self.created, 'skipped': self.skipped, 'failed': self.failed, 'errors': self.errors}
+
+    def hash_passwords(self, passwords):
+        # Без пароля в списке - непригодный пароль: студент задаст его через восстановление
+        if self.pool is None:
+            return [make_password(password) for password in passwords]
+        return list(self.pool.map(make_password, passwords, chunksize=max(1, len(passwords) // 32)))
+
+    def flush(self, batch):
+        if not batch:
+            return
+
+        usernames = [data['username'] for _, data in batch]
+        emails = [data['email'].lower() for _, data in batch]
+        existing_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        existing_emails = {
+            email.lower() for email in User.objects.filter(email__in=emails).values_list('email', flat=True)
+        }
+
+        accepted = []
+        batch_usernames = set()
+        for row, data in batch:
+            username, email = data['username'], data['email'].lower()
+            if username in existing_usernames:
+                # Уже создан (в том числе предыдущим запуском)
+                self.skipped += 1
+            elif username in batch_usernames:
+                self.add_error(row, {'username': ['Повторяется в файле']})
+            elif email in existing_emails or email in self.seen_emails:
+                self.add_error(row, {'email': ['Пользователь с таким email уже существует']})
+            else:
+                batch_usernames.add(username)
+                self.seen_emails.add(email)
+                accepted.append(data)
+        if not accepted:
+            return
+
+        hashes = self.hash_passwords([data.get('password') for data in accepted])
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(
+                    username=data['username'], email=data['email'], password=password_hash,
+                    first_name=data['first_name'][:150], last_name=data['last_name'][:150]
+                )
+                for data, password_hash in zip(accepted, hashes)
+            ], batch_size=self.batch_size)
+            # MySQL не возвращает id после bulk_create
+            ids = dict(
+                User.objects.filter(username__in=[data['username'] for data in accepted])
+                .values_list('username', 'id')
+            )
+            StudentProfile.objects.bulk_create([
+                StudentProfile(user_id=ids[data['username']], **{
+                    field: data[field] for field in PROFILE_FIELDS if field in data
+                })
+                for data in accepted
+            ], batch_size=self.batch_size)
+            Token.objects.bulk_create([
+                Token(key=Token.generate_key(), user_id=ids[data['username']]) for data in accepted
+            ], batch_size=self.batch_size)
+        self.created += len(accepted)
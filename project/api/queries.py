@@ -0,0 +1,188 @@
+import logging
+import re
+import sys
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+
+logger = logging.getLogger('api.queries')
+
+# Режимы: off - выключено, log - предупреждения в лог (staging), raise - исключение (тесты)
+MODES = ('off', 'log', 'raise')
+
+PROJECT_DIR = str(Path(__file__).resolve().parent.parent)
+# Обертки execute_wrapper не показываются в выдержке из стека
+WRAPPER_FILES = {__file__, metrics.__file__}
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACES = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def get_config():
+    return {'MODE': 'off', 'REPEAT_THRESHOLD': 5, 'STACK_DEPTH': 4, **getattr(settings, 'QUERY_INSPECTION', {})}
+
+
+def fingerprint(sql):
+    """Форма запроса без значений: IN-списки любой длины и числа сворачиваются"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def query_budget(limit):
+    """Бюджет запросов к БД для функционального представления (ставится над @api_view)"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def get_budget(view_func, method):
+    """
+    Бюджет из декоратора query_budget или из атрибута query_budget ViewSet:
+    число или словарь {действие: число}
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    cls = getattr(view_func, 'cls', None)
+    if budget is None and cls is not None:
+        budget = getattr(cls, 'query_budget', None)
+    if isinstance(budget, dict):
+        action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+        budget = budget.get(action)
+    return budget
+
+
+def _serializer_field(frame):
+    # Самое глубокое поле сериализатора DRF, которое сейчас выводится
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'to_representation' and code.co_filename.endswith('rest_framework/serializers.py'):
+            field = frame.f_locals.get('field')
+            serializer = frame.f_locals.get('self')
+            if field is not None and serializer is not None:
+                return f'{type(serializer).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return None
+
+
+def _stack_excerpt(depth):
+    # Последние кадры кода проекта, без библиотек
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(PROJECT_DIR) and frame.filename not in WRAPPER_FILES
+        and 'site-packages' not in frame.filename
+    ]
+    return traceback.format_list(frames[-depth:])
+
+
+class QueryInspector:
+    """execute_wrapper: считает запросы по формам и запоминает, откуда пришел повтор"""
+
+    def __init__(self, stack_depth):
+        self.stack_depth = stack_depth
+        self.count = 0
+        self.shapes = Counter()
+        self.sources = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        shape = fingerprint(sql)
+        self.shapes[shape] += 1
+        # Источник ищется только при первом повторе: стек дорогой
+        if self.shapes[shape] == 2:
+            self.sources[shape] = (_serializer_field(sys._getframe(1)), _stack_excerpt(self.stack_depth))
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def report(self, view, threshold):
+        lines = []
+        for shape, count in self.repeated(threshold):
+            field, stack = self.sources.get(shape, (None, []))
+            lines.append(f'  {count}x {shape}')
+            lines.append(f'    источник: {field or view}')
+            lines.extend(f'    {line.rstrip()}' for entry in stack for line in entry.splitlines())
+        return '\n'.join(lines)
+
+
+class QueryInspectionMiddleware:
+    """
+    Режим отладки и тестов: находит повторяющиеся формы запросов (N+1)
+    и проверяет бюджет запросов, объявленный представлением.
+    В режиме raise превышение бюджета - исключение, в режиме log - предупреждение.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = get_config()
+        if config['MODE'] == 'off':
+            return self.get_response(request)
+
+        inspector = QueryInspector(config['STACK_DEPTH'])
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            response = self.get_response(request)
+        self.check(request, inspector, config)
+        return response
+
+    async def __acall__(self, request):
+        config = get_config()
+        if config['MODE'] == 'off':
+            return await self.get_response(request)
+
+        inspector = request._query_inspector = QueryInspector(config['STACK_DEPTH'])
+        try:
+            response = await self.get_response(request)
+        finally:
+            installed = getattr(request, '_query_inspector_connections', None)
+            if installed is not None:
+                metrics.remove_query_wrapper(installed, inspector)
+        self.check(request, inspector, config)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = get_budget(view_func, request.method)
+        # Под ASGI обертка ставится здесь, в потоке представления (см. metrics.install_query_wrapper)
+        inspector = getattr(request, '_query_inspector', None)
+        if inspector is not None and not hasattr(request, '_query_inspector_connections'):
+            request._query_inspector_connections = metrics.install_query_wrapper(inspector)
+
+    def check(self, request, inspector, config):
+        match = getattr(request, 'resolver_match', None)
+        view = f'{request.method} {match.view_name if match else request.path}'
+        threshold = config['REPEAT_THRESHOLD']
+        report = inspector.report(view, threshold)
+        budget = getattr(request, '_query_budget', None)
+
+        if budget is not None and inspector.count > budget:
+            message = f'{view}: {inspector.count} запросов к БД при бюджете {budget}'
+            if report:
+                message = f'{message}\nПовторяющиеся запросы:\n{report}'
+            if config['MODE'] == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        elif report:
+            logger.warning('%s: повторяющиеся запросы (возможен N+1):\n%s', view, report)
@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Avg
+
+from .models import Application, StudentSkill, VacancySkill, Review
+
+
+# Вклад совпадения навыков и прошлых оценок работодателей в итоговую оценку
+SKILL_WEIGHT = 0.8
+RATING_WEIGHT = 0.2
+# Нормированная оценка для студентов без отзывов
+DEFAULT_RATING_SCORE = 0.5
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(vacancy_id):
+    return f'candidate_scores:{vacancy_id}'
+
+
+def compute_candidate_scores(vacancy_id):
+    """
+    Оценивает все заявки на вакансию за фиксированное число запросов:
+    навыки вакансии, навыки всех кандидатов и их средние оценки из отзывов.
+    Возвращает {id заявки: оценка от 0 до 1}.
+    """
+    applicants = dict(Application.objects.filter(vacancy_id=vacancy_id).values_list('id', 'student_id'))
+    if not applicants:
+        return {}
+
+    vacancy_skills = set(VacancySkill.objects.filter(vacancy_id=vacancy_id).values_list('skill_id', flat=True))
+
+    student_ids = set(applicants.values())
+    student_skills = defaultdict(set)
+    if vacancy_skills:
+        rows = StudentSkill.objects.filter(
+            student_id__in=student_ids, skill_id__in=vacancy_skills
+        ).values_list('student_id', 'skill_id')
+        for student_id, skill_id in rows:
+            student_skills[student_id].add(skill_id)
+
+    ratings = dict(
+        Review.objects.filter(application__student_id__in=student_ids, from_role='employer')
+        .values('application__student_id')
+        .annotate(avg=Avg('rating'))
+        .values_list('application__student_id', 'avg')
+    )
+
+    scores = {}
+    for application_id, student_id in applicants.items():
+        skill_score = len(student_skills[student_id]) / len(vacancy_skills) if vacancy_skills else 0.0
+        rating = ratings.get(student_id)
+        rating_score = (rating - 1) / 4 if rating is not None else DEFAULT_RATING_SCORE
+        scores[application_id] = round(SKILL_WEIGHT * skill_score + RATING_WEIGHT * rating_score, 4)
+    return scores
+
+
+def get_candidate_scores(vacancy_id):
+    """Оценки кандидатов из кэша; кэш сбрасывается сигналами при изменении заявок и навыков"""
+    key = _cache_key(vacancy_id)
+    scores = cache.get(key)
+    if scores is None:
+        scores = compute_candidate_scores(vacancy_id)
+        cache.set(key, scores, CACHE_TIMEOUT)
+    return scores
+
+
+def invalidate_candidate_scores(vacancy_id):
+    cache.delete(_cache_key(vacancy_id))
+
+
+def invalidate_student_scores(student_id):
+    """Сбрасывает оценки на всех вакансиях, куда откликался студент"""
+    vacancy_ids = Application.objects.filter(student_id=student_id).values_list('vacancy_id', flat=True)
+    cache.delete_many([_cache_key(vacancy_id) for vacancy_id in vacancy_ids])
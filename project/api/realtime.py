@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+# Максимум неотправленных событий на одно соединение: медленный клиент теряет старые
+QUEUE_SIZE = 100
+
+# Паузы между попытками переподключения к Redis, секунды
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+
+
+class Subscription:
+    def __init__(self, broker, user_id, loop):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def put(self, event):
+        # Выполняется в цикле событий подписчика
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Pub/sub уведомлений внутри процесса.
+    publish() можно вызывать из любого потока: событие передается в цикл
+    событий подписчика через call_soon_threadsafe.
+    События из других процессов (run_outbox_worker) сюда не доходят.
+    """
+    # Доставляет ли брокер события между процессами
+    shared = False
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def wants(self, user_id):
+        # Нет подключений пользователя в этом процессе - событие можно не готовить
+        return user_id in self._subscriptions
+
+    def deliver(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Цикл событий уже закрыт
+                self.unsubscribe(subscription)
+
+    def publish(self, user_id, event):
+        self.deliver(user_id, event)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Общий канал для нескольких процессов через Redis pub/sub.
+    Каждый процесс держит одну подписку на notifications:* в фоновом потоке
+    и раздает события своим локальным подписчикам.
+    """
+
+    CHANNEL_PREFIX = 'notifications:'
+    shared = True
+
+    def __init__(self, url='redis://localhost:6379/0', **options):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('Для RedisBroker нужен пакет redis')
+        self._redis = redis.Redis.from_url(url)
+        self._connection_errors = (redis.ConnectionError, redis.TimeoutError)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def _listen(self):
+        """
+        Подписка с переподключением: при обрыве связи попытки повторяются
+        с растущей паузой. События, отправленные во время обрыва, теряются;
+        счетчик непрочитанных клиент получает заново при переподключении SSE.
+        """
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(f'{self.CHANNEL_PREFIX}*')
+                delay = RECONNECT_MIN_DELAY
+                for message in pubsub.listen():
+                    channel = message['channel'].decode()
+                    user_id = int(channel[len(self.CHANNEL_PREFIX):])
+                    self.deliver(user_id, json.loads(message['data']))
+            except self._connection_errors as error:
+                logger.warning('Потеряна подписка на уведомления в Redis (%s), повтор через %.1f с', error, delay)
+            finally:
+                pubsub.close()
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def subscribe(self, user_id):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='notification-broker', daemon=True)
+                self._listener.start()
+        return super().subscribe(user_id)
+
+    def wants(self, user_id):
+        return True
+
+    def publish(self, user_id, event):
+        self._redis.publish(f'{self.CHANNEL_PREFIX}{user_id}', json.dumps(event, ensure_ascii=False, default=str))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Брокер из настройки NOTIFICATION_BROKER (по умолчанию InProcessBroker)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, 'NOTIFICATION_BROKER', {})
+                backend = import_string(config.get('BACKEND', 'api.realtime.InProcessBroker'))
+                _broker = backend(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def check_shared_broker():
+    """
+    Уведомления из отдельного процесса (run_outbox_worker) доходят до SSE-клиентов
+    только через общий брокер. Без него уведомления все равно создаются в БД,
+    а клиенты получают их при переподключении, поэтому это только предупреждение.
+    ALLOW_PROCESS_LOCAL отключает его, когда воркер и подписчики в одном процессе (тесты).
+    """
+    config = getattr(settings, 'NOTIFICATION_BROKER', {})
+    if not get_broker().shared and not config.get('ALLOW_PROCESS_LOCAL', False):
+        logger.warning(
+            'Брокер уведомлений не общий для процессов: уведомления воркера outbox не дойдут '
+            "до подключенных клиентов сразу. Укажите NOTIFICATION_BROKER['BACKEND'] = 'api.realtime.RedisBroker'"
+        )
+
+
+def publish_notifications(notifications):
+    """Отправляет созданные уведомления подключенным пользователям"""
+    from .serializers import NotificationSerializer
+
+    broker = get_broker()
+    for notification in notifications:
+        if not broker.wants(notification.user_id):
+            continue
+        # id может отсутствовать у уведомлений из bulk_create на MySQL
+        broker.publish(notification.user_id, {
+            'type': 'notification',
+            'notification': json.loads(json.dumps(NotificationSerializer(notification).data, default=str)),
+        })
+
+
+def publish_unread_count(user_id, count):
+    broker = get_broker()
+    if broker.wants(user_id):
+        broker.publish(user_id, {'type': 'unread_count', 'count': count})
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
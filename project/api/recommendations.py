@@ -0,0 +1,175 @@
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .models import VacancySkill
+
+
+# Общая версия индекса: каждое изменение увеличивает ее, и индексы других процессов
+# перестраиваются при следующем запросе
+VERSION_KEY = 'skill_index_version'
+
+# Перестройка по времени на случай процессного кэша (LocMemCache) и изменений мимо сигналов
+REBUILD_INTERVAL = 10 * 60
+
+
+def get_index_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_skill_index():
+    """Вызывается после изменений навыков вакансий в обход сигналов (bulk_create и т. п.)"""
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # Ключа нет (кэш очищен) - начинаем новую версию
+        cache.set(VERSION_KEY, 2, None)
+        return 2
+
+
+class SkillMatchIndex:
+    """
+    Разреженная матрица "навык -> активные вакансии" в памяти процесса.
+    Изменения этого процесса применяются на месте, изменения других процессов
+    замечаются по общей версии в кэше (и не реже чем раз в REBUILD_INTERVAL).
+
+    Оценка вакансий для студента - один проход по спискам вакансий его
+    навыков (произведение разреженной матрицы на вектор весов навыков),
+    без запросов к БД на каждую вакансию. Редкие навыки весят больше (IDF).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._version = None
+        self._built_at = 0.0
+        self._skill_vacancies = defaultdict(set)  # id навыка -> id активных вакансий
+        self._vacancy_skills = {}  # id активной вакансии -> frozenset id навыков
+
+    def _remove(self, vacancy_id):
+        skills = self._vacancy_skills.pop(vacancy_id, ())
+        for skill_id in skills:
+            vacancies = self._skill_vacancies.get(skill_id)
+            if vacancies is not None:
+                vacancies.discard(vacancy_id)
+                if not vacancies:
+                    del self._skill_vacancies[skill_id]
+
+    def _add(self, vacancy_id, skill_ids):
+        self._vacancy_skills[vacancy_id] = frozenset(skill_ids)
+        for skill_id in skill_ids:
+            self._skill_vacancies[skill_id].add(vacancy_id)
+
+    def _changed(self):
+        # Своя правка не требует перестройки, если версию больше никто не менял
+        before = self._version
+        version = invalidate_skill_index()
+        if self._built and version == before + 1:
+            self._version = version
+
+    def _is_stale(self):
+        return (
+            time.monotonic() - self._built_at > REBUILD_INTERVAL
+            or get_index_version() != self._version
+        )
+
+    def build(self):
+        with self._lock:
+            self.clear()
+            # Версия читается до данных: правка во время построения вызовет повторную перестройку
+            self._version = get_index_version()
+            self._built_at = time.monotonic()
+            vacancy_skills = defaultdict(list)
+            rows = VacancySkill.objects.filter(vacancy__is_active=True).values_list('vacancy_id', 'skill_id')
+            for vacancy_id, skill_id in rows.iterator(chunk_size=5000):
+                vacancy_skills[vacancy_id].append(skill_id)
+            for vacancy_id, skill_ids in vacancy_skills.items():
+                self._add(vacancy_id, skill_ids)
+            self._built = True
+
+    def clear(self):
+        with self._lock:
+            self._built = False
+            self._skill_vacancies.clear()
+            self._vacancy_skills.clear()
+
+    def refresh_vacancy(self, vacancy_id):
+        """Перечитывает навыки и активность одной вакансии из БД"""
+        with self._lock:
+            # До первого запроса индекс не построен: build() прочитает актуальные данные
+            if self._built:
+                self._remove(vacancy_id)
+                skill_ids = list(
+                    VacancySkill.objects.filter(vacancy_id=vacancy_id, vacancy__is_active=True)
+                    .values_list('skill_id', flat=True)
+                )
+                if skill_ids:
+                    self._add(vacancy_id, skill_ids)
+            self._changed()
+
+    def add_vacancies(self, vacancy_skills):
+        """Добавляет активные вакансии с уже известными навыками: {id вакансии: [id навыков]}"""
+        with self._lock:
+            if self._built:
+                for vacancy_id, skill_ids in vacancy_skills.items():
+                    self._remove(vacancy_id)
+                    if skill_ids:
+                        self._add(vacancy_id, skill_ids)
+            self._changed()
+
+    def remove(self, vacancy_id):
+        with self._lock:
+            if self._built:
+                self._remove(vacancy_id)
+            self._changed()
+
+    def _weight(self, skill_id, vacancy_count):
+        return math.log(1 + vacancy_count / len(self._skill_vacancies[skill_id]))
+
+    def rank(self, skill_ids, limit=20):
+        """Возвращает [(id вакансии, оценка)] по убыванию оценки"""
+        with self._lock:
+            if not self._built or self._is_stale():
+                self.build()
+
+            vacancy_count = len(self._vacancy_skills)
+            weights = {
+                skill_id: self._weight(skill_id, vacancy_count)
+                for skill_id in set(skill_ids) if skill_id in self._skill_vacancies
+            }
+
+            scores = defaultdict(float)
+            for skill_id, weight in weights.items():
+                for vacancy_id in self._skill_vacancies[skill_id]:
+                    scores[vacancy_id] += weight
+
+            ranked = []
+            for vacancy_id, score in scores.items():
+                # Доля требований вакансии, закрытых навыками студента
+                total = sum(self._weight(s, vacancy_count) for s in self._vacancy_skills[vacancy_id])
+                ranked.append((vacancy_id, round(score, 4), score / total if total else 0.0))
+
+        ranked.sort(key=lambda item: (-item[1], -item[2], -item[0]))
+        return [(vacancy_id, score) for vacancy_id, score, _ in ranked[:limit]]
+
+
+skill_index = SkillMatchIndex()
+
+
+def recommend_vacancies(queryset, skill_ids, limit=20):
+    """Активные вакансии из queryset, отсортированные по совпадению навыков"""
+    ranked = skill_index.rank(skill_ids, limit=limit)
+    scores = dict(ranked)
+    positions = {vacancy_id: position for position, (vacancy_id, _) in enumerate(ranked)}
+    vacancies = list(queryset.filter(id__in=scores, is_active=True))
+    for vacancy in vacancies:
+        vacancy.match_score = scores[vacancy.id]
+    vacancies.sort(key=lambda v: positions[v.id])
+    return vacancies
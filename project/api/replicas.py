@@ -0,0 +1,80 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+
+# Включается на время безопасных запросов к действиям из replica_actions
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def get_config():
+    return {'ALIASES': [], 'PIN_SECONDS': 10, **getattr(settings, 'DATABASE_REPLICAS', {})}
+
+
+def reading_from_replica():
+    return _use_replica.get() and bool(get_config()['ALIASES'])
+
+
+def _pin_key(user_id):
+    return f'db_primary_pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """После записи пользователь PIN_SECONDS читает с основной БД и видит свои изменения"""
+    cache.set(_pin_key(user.pk), True, get_config()['PIN_SECONDS'])
+
+
+def is_pinned(user):
+    return user.is_authenticated and cache.get(_pin_key(user.pk)) is not None
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри запросов, отмеченных ReplicaRoutingMixin, идут на случайную реплику
+    из DATABASE_REPLICAS['ALIASES'], все остальное - на default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            aliases = get_config()['ALIASES']
+            if aliases:
+                return random.choice(aliases)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД
+        return True
+
+
+class ReplicaRoutingMixin:
+    """
+    Для ViewSet: GET/HEAD к действиям replica_actions читают с реплики,
+    успешный изменяющий запрос закрепляет пользователя за основной БД.
+    """
+    replica_actions = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _use_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        # После аутентификации и проверки прав: они читают с основной БД
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and self.action in self.replica_actions and not is_pinned(request.user):
+            _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and request.user.is_authenticated):
+            pin_to_primary(request.user)
+        return response
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+
+
+# Обратные связи один-к-одному с профилями пользователя
+PROFILE_RELATIONS = [('student', User.student_profile.related), ('employer', User.employer_profile.related)]
+
+
+def resolve_profile(user):
+    """
+    Роль и профиль пользователя: (роль, профиль или None).
+    Оба профиля загружаются одним запросом и запоминаются в объекте
+    пользователя, который создается заново на каждый запрос. Кэши связей
+    тоже заполняются, поэтому user.student_profile не делает новых запросов.
+    """
+    if user is None or not user.is_authenticated:
+        return 'anonymous', None
+
+    resolved = getattr(user, '_resolved_profile', None)
+    if resolved is not None:
+        return resolved
+
+    if not all(related.is_cached(user) for _, related in PROFILE_RELATIONS):
+        loaded = User.objects.select_related(
+            *(related.get_accessor_name() for _, related in PROFILE_RELATIONS)
+        ).filter(pk=user.pk).first()
+        for _, related in PROFILE_RELATIONS:
+            related.set_cached_value(user, related.get_cached_value(loaded, default=None) if loaded else None)
+        if loaded is not None:
+            # Пользователь из кэша токенов загружен без части полей: берем их из этой же строки
+            for name in user.get_deferred_fields():
+                setattr(user, name, getattr(loaded, name))
+
+    resolved = ('admin' if user.is_staff else 'unknown', None)
+    for role, related in PROFILE_RELATIONS:
+        profile = related.get_cached_value(user)
+        if profile is not None:
+            resolved = (role, profile)
+            break
+    user._resolved_profile = resolved
+    return resolved
+
+
+def get_role(user):
+    return resolve_profile(user)[0]
+
+
+def get_student_profile(user):
+    role, profile = resolve_profile(user)
+    return profile if role == 'student' else None
+
+
+def get_employer_profile(user):
+    role, profile = resolve_profile(user)
+    if role == 'employer':
+        return profile
+    # Пользователь с обоими профилями считается студентом, но остается работодателем
+    if role == 'student':
+        return User.employer_profile.related.get_cached_value(user, default=None)
+    return None
@@ -0,0 +1,180 @@
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Vacancy
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Вес совпадения в заголовке выше, чем в описании и требованиях
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'description': 1.0,
+    'requirements': 1.0,
+}
+
+# Параметры ранжирования BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1]
+
+
+class VacancySearchIndex:
+    """
+    Инвертированный индекс вакансий в памяти процесса.
+
+    Используется на бэкендах без полнотекстового поиска (SQLite в тестах).
+    Поиск затрагивает только списки вхождений слов из запроса, поэтому
+    его стоимость не растет линейно с числом вакансий.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._postings = defaultdict(dict)  # слово -> {id вакансии: взвешенная частота}
+        self._doc_terms = {}  # id вакансии -> слова документа (для удаления)
+        self._doc_lengths = {}
+        self._active = set()
+        self._total_length = 0.0
+
+    def _document_terms(self, title, description, requirements):
+        terms = defaultdict(float)
+        for field, text in (('title', title), ('description', description), ('requirements', requirements)):
+            for token in tokenize(text):
+                terms[token] += FIELD_WEIGHTS[field]
+        return terms
+
+    def _remove(self, vacancy_id):
+        terms = self._doc_terms.pop(vacancy_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(vacancy_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(vacancy_id, 0.0)
+        self._active.discard(vacancy_id)
+
+    def _add(self, vacancy_id, title, description, requirements, is_active):
+        terms = self._document_terms(title, description, requirements)
+        for term, weight in terms.items():
+            self._postings[term][vacancy_id] = weight
+        length = sum(terms.values())
+        self._doc_terms[vacancy_id] = tuple(terms)
+        self._doc_lengths[vacancy_id] = length
+        self._total_length += length
+        if is_active:
+            self._active.add(vacancy_id)
+
+    def build(self):
+        with self._lock:
+            self.clear()
+            rows = Vacancy.objects.values_list(
+                'id', 'title', 'description', 'requirements', 'is_active'
+            ).iterator(chunk_size=2000)
+            for row in rows:
+                self._add(*row)
+            self._built = True
+
+    def clear(self):
+        with self._lock:
+            self._built = False
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._active.clear()
+            self._total_length = 0.0
+
+    def update(self, vacancy):
+        with self._lock:
+            # До первого поиска индекс не построен: build() прочитает актуальные данные
+            if not self._built:
+                return
+            self._remove(vacancy.pk)
+            self._add(vacancy.pk, vacancy.title, vacancy.description,
+                      vacancy.requirements, vacancy.is_active)
+
+    def remove(self, vacancy_id):
+        with self._lock:
+            if self._built:
+                self._remove(vacancy_id)
+
+    def search(self, query, limit=20):
+        """Возвращает [(id вакансии, релевантность)] по убыванию релевантности"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            if not self._built:
+                self.build()
+
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+            avg_length = self._total_length / doc_count or 1.0
+
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for vacancy_id, tf in postings.items():
+                    if vacancy_id not in self._active:
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[vacancy_id] / avg_length)
+                    scores[vacancy_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[:limit]
+
+
+vacancy_index = VacancySearchIndex()
+
+
+def uses_native_fulltext():
+    return connection.vendor == 'mysql'
+
+
+def search_vacancies(queryset, query, limit=20):
+    """
+    Ищет вакансии по title, description и requirements.
+
+    На MySQL используется индекс FULLTEXT (см. миграцию 0003),
+    на остальных бэкендах - VacancySearchIndex.
+    Возвращает список вакансий, отсортированный по релевантности.
+    """
+    queryset = queryset.filter(is_active=True)
+
+    if uses_native_fulltext():
+        match = RawSQL(
+            'MATCH (vacancy.title, vacancy.description, vacancy.requirements) '
+            'AGAINST (%s IN NATURAL LANGUAGE MODE)',
+            [query]
+        )
+        return list(
+            queryset.annotate(relevance=match)
+            .filter(relevance__gt=0)
+            .order_by('-relevance', '-id')[:limit]
+        )
+
+    ranked = vacancy_index.search(query, limit=limit)
+    scores = dict(ranked)
+    vacancies = list(queryset.filter(id__in=scores))
+    for vacancy in vacancies:
+        vacancy.relevance = scores[vacancy.id]
+    vacancies.sort(key=lambda v: (-v.relevance, -v.id))
+    return vacancies
@@ -1,14 +1,94 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers
 from .models import *
 
 
-class UserSerializer(serializers.ModelSerializer):
+def _split_param(request, name):
+    if request is None or name not in request.query_params:
+        return None
+    return {part.strip() for part in request.query_params.get(name, '').split(',') if part.strip()}
+
+
+def requested_fields(request):
+    """Поля из ?fields=id,status,vacancy.title или None, если выводятся все поля"""
+    return _split_param(request, 'fields')
+
+
+def expanded_fields(request):
+    """
+    Вложенные объекты из ?expand=vacancy,vacancy.employer.
+    None - параметра нет, все вложенные объекты разворачиваются как раньше;
+    иначе неперечисленные вложенные объекты выводятся как id.
+    """
+    return _split_param(request, 'expand')
+
+
+def is_field_requested(request, path):
+    fields = requested_fields(request)
+    if fields is None:
+        return True
+    return any(field == path or field.startswith(path + '.') or path.startswith(field + '.') for field in fields)
+
+
+def is_field_expanded(request, path):
+    expand = expanded_fields(request)
+    return expand is None or path in expand
+
+
+class DynamicFieldsMixin:
+    """
+    Поддержка ?fields= и ?expand= для сериализаторов чтения.
+    Параметры берутся из request в контексте и применяются по пути поля,
+    поэтому работают и для вложенных сериализаторов.
+    """
+
+    def _field_path(self):
+        parts = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                parts.append(node.field_name)
+            node = node.parent
+        return '.'.join(reversed(parts))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return fields
+
+        path = self._field_path()
+        prefix = f'{path}.' if path else ''
+
+        requested = requested_fields(request)
+        if requested is not None:
+            names = {field[len(prefix):].split('.')[0] for field in requested if field.startswith(prefix)}
+            # Для вложенного объекта без уточнений выводятся все поля
+            if names:
+                for name in list(fields):
+                    if name not in names:
+                        fields.pop(name)
+
+        if expanded_fields(request) is not None:
+            for name, field in list(fields.items()):
+                nested = field.child if isinstance(field, serializers.ListSerializer) else field
+                if isinstance(nested, serializers.BaseSerializer) and not is_field_expanded(request, prefix + name):
+                    fields[name] = serializers.PrimaryKeyRelatedField(
+                        read_only=True,
+                        source=field.source,
+                        many=isinstance(field, serializers.ListSerializer)
+                    )
+
+        return fields
+
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
 
 
-class StudentProfileSerializer(serializers.ModelSerializer):
+class StudentProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -16,7 +96,7 @@ class StudentProfileSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class EmployerProfileSerializer(serializers.ModelSerializer):
+class EmployerProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -24,13 +104,13 @@ class EmployerProfileSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Skill
         fields = ['id', 'name']
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug']
@@ -84,27 +164,65 @@ class VacancyCreateUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class VacancySerializer(serializers.ModelSerializer):
+class VacancyImportSerializer(serializers.ModelSerializer):
+    """
+    Строка массового импорта. Категория и навыки задаются названиями и
+    ищутся в словарях из context (categories, skills), без запросов к БД.
+    """
+    category = serializers.CharField(required=False, allow_blank=True)
+    skills = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta:
+        model = Vacancy
+        fields = ['title', 'description', 'requirements', 'vacancy_type',
+                  'salary', 'location', 'is_active', 'category', 'skills']
+
+    def validate_category(self, value):
+        if not value.strip():
+            return None
+        category_id = self.context['categories'].get(value.strip().lower())
+        if category_id is None:
+            raise serializers.ValidationError(f'Неизвестная категория: {value}')
+        return category_id
+
+    def validate_skills(self, value):
+        skills = self.context['skills']
+        unknown = [name for name in value if name.strip().lower() not in skills]
+        if unknown:
+            raise serializers.ValidationError(f'Неизвестные навыки: {", ".join(unknown)}')
+        return list(dict.fromkeys(skills[name.strip().lower()] for name in value))
+
+
+class StudentRosterSerializer(serializers.Serializer):
+    """Строка списка студентов для provision_students. Уникальность проверяется пачками отдельно"""
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField()
+    password = serializers.CharField(required=False, write_only=True)
+    first_name = serializers.CharField(max_length=255)
+    last_name = serializers.CharField(max_length=255)
+    faculty = serializers.CharField(max_length=255)
+    course = serializers.IntegerField(min_value=1)
+    phone = serializers.CharField(max_length=20, required=False)
+    resume_url = serializers.URLField(max_length=500, required=False)
+
+
+class VacancySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     employer = EmployerProfileSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     skills = SkillSerializer(many=True, read_only=True)
-    applications_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Vacancy
         fields = '__all__'
-    
-    def get_applications_count(self, obj):
-        return obj.applications.count()
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ['id', 'rating', 'comment', 'from_role', 'created_at']
 
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class ApplicationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     student = StudentProfileSerializer(read_only=True)
     vacancy = VacancySerializer(read_only=True)
     review = ReviewSerializer(read_only=True)
@@ -131,13 +249,13 @@ class ApplyToVacancySerializer(serializers.Serializer):
         return value
 
 
-class InterviewSerializer(serializers.ModelSerializer):
+class InterviewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Interview
         fields = '__all__'
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
\ No newline at end of file
@@ -0,0 +1,276 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .facets import apply_deltas, field_facets, vacancy_field_facets, skill_facets
+from .models import (
+    Application, Category, Notification, Review, StudentProfile, StudentSkill, Vacancy, VacancySkill, VacancyFacet
+)
+from .authentication import revoke_token, revoke_user_tokens
+from .counters import notifications_created, notifications_deleted
+from .realtime import publish_notifications
+from .ranking import invalidate_candidate_scores, invalidate_student_scores
+from .caching import invalidate_vacancy_cache
+from .recommendations import skill_index
+from .search import vacancy_index
+
+
+# Инкрементальное обновление поискового индекса вакансий
+@receiver(post_save, sender=Vacancy)
+def update_vacancy_search_index(sender, instance, **kwargs):
+    vacancy_index.update(instance)
+
+
+@receiver(post_delete, sender=Vacancy)
+def remove_vacancy_from_search_index(sender, instance, **kwargs):
+    vacancy_index.remove(instance.pk)
+
+
+# Счетчики фасетов: учитываются только активные вакансии
+@receiver(pre_save, sender=Vacancy)
+def remember_vacancy_facets(sender, instance, **kwargs):
+    instance._facet_snapshot = None
+    if instance.pk:
+        instance._facet_snapshot = Vacancy.objects.filter(pk=instance.pk).values_list(
+            'category_id', 'vacancy_type', 'location', 'salary', 'is_active'
+        ).first()
+
+
+@receiver(post_save, sender=Vacancy)
+def update_vacancy_facets(sender, instance, created, **kwargs):
+    old = getattr(instance, '_facet_snapshot', None)
+    was_active = bool(old and old[4])
+
+    deltas = Counter()
+    if was_active:
+        deltas.subtract(field_facets(*old[:4]))
+    if instance.is_active:
+        deltas.update(vacancy_field_facets(instance))
+
+    # При смене активности навыки вакансии тоже входят или выходят из подсчета
+    if not created and was_active != instance.is_active:
+        skill_ids = list(VacancySkill.objects.filter(vacancy=instance).values_list('skill_id', flat=True))
+        if instance.is_active:
+            deltas.update(skill_facets(skill_ids))
+        else:
+            deltas.subtract(skill_facets(skill_ids))
+
+    apply_deltas(deltas)
+
+
+@receiver(pre_delete, sender=Vacancy)
+def release_vacancy_facets(sender, instance, **kwargs):
+    # Навыки удаляются каскадом и учитываются в remove_vacancy_skill_facet
+    if instance.is_active:
+        deltas = Counter()
+        deltas.subtract(vacancy_field_facets(instance))
+        apply_deltas(deltas)
+
+
+def _is_active_vacancy(vacancy_id):
+    return Vacancy.objects.filter(pk=vacancy_id, is_active=True).exists()
+
+
+@receiver(pre_save, sender=VacancySkill)
+def remember_vacancy_skill(sender, instance, **kwargs):
+    instance._facet_snapshot = None
+    if instance.pk:
+        instance._facet_snapshot = VacancySkill.objects.filter(pk=instance.pk).values_list(
+            'vacancy_id', 'skill_id'
+        ).first()
+
+
+@receiver(post_save, sender=VacancySkill)
+def add_vacancy_skill_facet(sender, instance, **kwargs):
+    deltas = Counter()
+    old = getattr(instance, '_facet_snapshot', None)
+    if old and _is_active_vacancy(old[0]):
+        deltas.subtract(skill_facets([old[1]]))
+    if _is_active_vacancy(instance.vacancy_id):
+        deltas.update(skill_facets([instance.skill_id]))
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=VacancySkill)
+def remove_vacancy_skill_facet(sender, instance, **kwargs):
+    if _is_active_vacancy(instance.vacancy_id):
+        deltas = Counter()
+        deltas.subtract(skill_facets([instance.skill_id]))
+        apply_deltas(deltas)
+
+
+# skills.set()/add() создают строки через bulk_create без post_save,
+# удаление же идет через QuerySet.delete() и попадает в post_delete
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def add_vacancy_skills_facets(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+
+    if not reverse:
+        if instance.is_active:
+            apply_deltas(Counter(skill_facets(pk_set)))
+    else:
+        active = Vacancy.objects.filter(pk__in=pk_set, is_active=True).count()
+        apply_deltas(Counter({('skill', str(instance.pk)): active}))
+
+
+@receiver(post_delete, sender=Category)
+def remove_category_facet(sender, instance, **kwargs):
+    VacancyFacet.objects.filter(facet='category', value=str(instance.pk)).delete()
+
+
+# Индекс рекомендаций по навыкам
+@receiver(post_save, sender=Vacancy)
+@receiver(post_save, sender=VacancySkill)
+@receiver(post_delete, sender=VacancySkill)
+def refresh_vacancy_skill_index(sender, instance, **kwargs):
+    if sender is Vacancy:
+        skill_index.refresh_vacancy(instance.pk)
+        return
+
+    skill_index.refresh_vacancy(instance.vacancy_id)
+    # Строку навыка могли перенести на другую вакансию
+    old = getattr(instance, '_facet_snapshot', None)
+    if old and old[0] != instance.vacancy_id:
+        skill_index.refresh_vacancy(old[0])
+
+
+@receiver(post_delete, sender=Vacancy)
+def remove_vacancy_from_skill_index(sender, instance, **kwargs):
+    skill_index.remove(instance.pk)
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def refresh_vacancy_skills_index(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        skill_index.refresh_vacancy(instance.pk)
+    elif pk_set:
+        for vacancy_id in pk_set:
+            skill_index.refresh_vacancy(vacancy_id)
+
+
+# Кэш оценок кандидатов по вакансии
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=VacancySkill)
+@receiver(post_delete, sender=VacancySkill)
+def invalidate_vacancy_candidate_scores(sender, instance, **kwargs):
+    invalidate_candidate_scores(instance.vacancy_id)
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def invalidate_vacancy_skills_candidate_scores(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_candidate_scores(instance.pk)
+    elif pk_set:
+        for vacancy_id in pk_set:
+            invalidate_candidate_scores(vacancy_id)
+
+
+@receiver(post_save, sender=StudentSkill)
+@receiver(post_delete, sender=StudentSkill)
+def invalidate_student_skill_candidate_scores(sender, instance, **kwargs):
+    invalidate_student_scores(instance.student_id)
+
+
+@receiver(m2m_changed, sender=StudentProfile.skills.through)
+def invalidate_student_skills_candidate_scores(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_student_scores(instance.pk)
+    elif pk_set:
+        for student_id in pk_set:
+            invalidate_student_scores(student_id)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_candidate_scores(sender, instance, **kwargs):
+    student_id = Application.objects.filter(pk=instance.application_id).values_list('student_id', flat=True).first()
+    if student_id is not None:
+        invalidate_student_scores(student_id)
+
+
+# Кэш публичных ответов VacancyViewSet
+@receiver(post_save, sender=Vacancy)
+@receiver(post_delete, sender=Vacancy)
+@receiver(post_save, sender=VacancySkill)
+@receiver(post_delete, sender=VacancySkill)
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_vacancy_responses(sender, **kwargs):
+    invalidate_vacancy_cache()
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def invalidate_vacancy_skills_responses(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_vacancy_cache()
+
+
+# Денормализованный Vacancy.applications_count: покрывает apply, perform_create и каскадные удаления
+@receiver(post_save, sender=Application)
+def increment_applications_count(sender, instance, created, **kwargs):
+    if created:
+        Vacancy.objects.filter(pk=instance.vacancy_id).update(applications_count=F('applications_count') + 1)
+
+
+@receiver(post_delete, sender=Application)
+def decrement_applications_count(sender, instance, **kwargs):
+    Vacancy.objects.filter(pk=instance.vacancy_id, applications_count__gt=0).update(
+        applications_count=F('applications_count') - 1
+    )
+
+
+# Поток уведомлений (SSE): одиночные уведомления; пакетные публикует outbox.create_notifications
+@receiver(post_save, sender=Notification)
+def publish_created_notification(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_notifications([instance]))
+
+
+# Счетчик непрочитанных: пакетные создания учитывает outbox.create_notifications,
+# прочтения - NotificationViewSet
+@receiver(post_save, sender=Notification)
+def count_created_notification(sender, instance, created, **kwargs):
+    if created:
+        notifications_created([instance])
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        notifications_deleted({instance.user_id: 1})
+
+
+# Кэш токенов (CachedTokenAuthentication): выход, смена пароля и блокировка отзывают
+# токены пользователя сразу и еще раз после коммита, чтобы не осталось значения,
+# закэшированного из еще не измененных данных
+@receiver(post_delete, sender=Token)
+def revoke_deleted_token(sender, instance, **kwargs):
+    key = instance.key
+    revoke_token(key)
+    transaction.on_commit(lambda: revoke_token(key))
+
+
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_credentials_change(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and not {'password', 'is_active'} & set(update_fields)):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list('password', 'is_active').first()
+    if old is not None and old != (instance.password, instance.is_active):
+        user_id = instance.pk
+        revoke_user_tokens(user_id)
+        transaction.on_commit(lambda: revoke_user_tokens(user_id))
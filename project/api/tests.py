@@ -1,3 +1,1305 @@
-from django.test import TestCase
+import json
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .models import *
+
+
+def create_vacancies(count, employer=None):
+    """Создает count вакансий с категорией, навыками и заявками"""
+    if employer is None:
+        employer_user = User.objects.create_user(username='employer', password='pass12345')
+        employer = EmployerProfile.objects.create(
+            user=employer_user, first_name='Иван', last_name='Иванов',
+            company_name='Кампус', department='ИТ', contact_person='Иван', phone='123'
+        )
+    category, _ = Category.objects.get_or_create(name='ИТ', slug='it')
+    skills = [Skill.objects.get_or_create(name=name)[0] for name in ('Python', 'SQL', 'Django')]
+
+    vacancies = []
+    for i in range(count):
+        vacancy = Vacancy.objects.create(
+            employer=employer, title=f'Вакансия {i}', description='Описание',
+            requirements='Требования', vacancy_type='work', location='Кампус',
+            category=category
+        )
+        vacancy.skills.set(skills)
+        vacancies.append(vacancy)
+    return employer, vacancies
+
+
+def create_student(username='student'):
+    user = User.objects.create_user(username=username, password='pass12345')
+    return StudentProfile.objects.create(
+        user=user, first_name='Петр', last_name='Петров', faculty='ФИТ', course=2
+    )
+
+
+class VacancyListQueryBudgetTest(TestCase):
+    # Список вакансий не должен выполнять запросы на каждую строку
+    QUERY_BUDGET = 2
+
+    def setUp(self):
+        self.client = APIClient()
+        _, vacancies = create_vacancies(5)
+        for i in range(3):
+            student = create_student(f'student{i}')
+            Application.objects.create(
+                student=student, vacancy=vacancies[0],
+                resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+            )
+
+    def test_list_query_count_is_constant(self):
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get('/api/vacancies/')
+        self.assertEqual(response.status_code, 200)
+
+        create_vacancies(10, employer=EmployerProfile.objects.get())
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            self.client.get('/api/vacancies/')
+
+    def test_applications_count_is_denormalized(self):
+        response = self.client.get('/api/vacancies/')
+        counts = {item['title']: item['applications_count'] for item in response.json()['results']}
+        self.assertEqual(counts['Вакансия 0'], 3)
+        self.assertEqual(counts['Вакансия 1'], 0)
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        create_vacancies(5)
+
+    def test_pages_are_stable_under_inserts(self):
+        response = self.client.get('/api/vacancies/?page_size=2')
+        first_page = response.json()
+        self.assertEqual(len(first_page['results']), 2)
+
+        # Новая вакансия не должна сдвигать следующую страницу
+        create_vacancies(1, employer=EmployerProfile.objects.get())
+
+        seen = [item['id'] for item in first_page['results']]
+        next_url = first_page['next']
+        while next_url:
+            page = self.client.get(next_url).json()
+            seen.extend(item['id'] for item in page['results'])
+            next_url = page['next']
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+
+class VacancySearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        employer, vacancies = create_vacancies(3)
+        Vacancy.objects.filter(pk=vacancies[0].pk).update(title='Python разработчик')
+        vacancies[1].description = 'Нужен опыт Python и Django'
+        vacancies[1].save()
+        vacancies[2].title = 'Python аналитик'
+        vacancies[2].is_active = False
+        vacancies[2].save()
+        self.vacancies = vacancies
+
+    def test_ranks_title_matches_first_and_skips_inactive(self):
+        # Индекс строится при первом поиске из БД, дальше обновляется сигналами
+        from .search import vacancy_index
+        vacancy_index.clear()
+
+        response = self.client.get('/api/vacancies/search/?q=python')
+        ids = [item['id'] for item in response.json()]
+        self.assertEqual(ids, [self.vacancies[0].id, self.vacancies[1].id])
+
+        self.vacancies[1].delete()
+        response = self.client.get('/api/vacancies/search/?q=python')
+        self.assertEqual([item['id'] for item in response.json()], [self.vacancies[0].id])
+
+    def test_query_is_required(self):
+        response = self.client.get('/api/vacancies/search/')
+        self.assertEqual(response.status_code, 400)
+
+
+class VacancyFacetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, self.vacancies = create_vacancies(3)
+
+    def facets(self):
+        return self.client.get('/api/vacancies/facets/').json()
+
+    def test_counts_follow_vacancy_changes(self):
+        python = Skill.objects.get(name='Python')
+        facets = self.facets()
+        self.assertEqual(facets['vacancy_type'], {'work': 3})
+        self.assertEqual(facets['skill'][str(python.id)], 3)
+        self.assertEqual(facets['salary_band'], {'none': 3})
+
+        vacancy = self.vacancies[0]
+        vacancy.vacancy_type = 'internship'
+        vacancy.salary = 30000
+        vacancy.save()
+        vacancy.skills.remove(python)
+        self.vacancies[1].is_active = False
+        self.vacancies[1].save()
+        self.vacancies[2].delete()
+
+        facets = self.facets()
+        self.assertEqual(facets['vacancy_type'], {'internship': 1})
+        self.assertEqual(facets['salary_band'], {'20000-40000': 1})
+        self.assertNotIn(str(python.id), facets['skill'])
+        self.assertEqual(sum(facets['skill'].values()), 2)
+
+    def test_counts_are_single_query(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/vacancies/facets/')
+
+    def test_data_migration_matches_rebuild(self):
+        from importlib import import_module
+        from django.apps import apps
+        from .facets import rebuild_facets
+        self.vacancies[0].salary = 45000
+        self.vacancies[0].save()
+
+        rebuild_facets()
+        expected = set(VacancyFacet.objects.values_list('facet', 'value', 'count'))
+        VacancyFacet.objects.all().delete()
+        import_module('api.migrations.0004_vacancy_facet').populate_facets(apps, None)
+        self.assertEqual(set(VacancyFacet.objects.values_list('facet', 'value', 'count')), expected)
+
+    def test_list_filters(self):
+        python = Skill.objects.get(name='Python')
+        vacancy = self.vacancies[0]
+        vacancy.salary = 50000
+        vacancy.vacancy_type = 'internship'
+        vacancy.save()
+        self.vacancies[1].skills.remove(python)
+
+        response = self.client.get('/api/vacancies/?type=internship&salary_band=40000-60000')
+        self.assertEqual([item['id'] for item in response.json()['results']], [vacancy.id])
+
+        response = self.client.get(f'/api/vacancies/?skills={python.id}')
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class RecommendedVacanciesTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, _ = create_vacancies(0)
+        self.python, self.sql, self.rust = [
+            Skill.objects.get_or_create(name=name)[0] for name in ('Python', 'SQL', 'Rust')
+        ]
+        self.student = create_student()
+        StudentSkill.objects.create(student=self.student, skill=self.python)
+        StudentSkill.objects.create(student=self.student, skill=self.rust)
+        self.client.force_authenticate(self.student.user)
+
+        from .recommendations import skill_index
+        skill_index.clear()
+
+    def create_vacancy(self, title, skills, is_active=True):
+        vacancy = Vacancy.objects.create(
+            employer=self.employer, title=title, description='Описание',
+            requirements='Требования', vacancy_type='work', location='Кампус',
+            is_active=is_active
+        )
+        vacancy.skills.set(skills)
+        return vacancy
+
+    def test_rare_skills_rank_higher(self):
+        common = [self.create_vacancy(f'Python {i}', [self.python, self.sql]) for i in range(3)]
+        rare = self.create_vacancy('Rust', [self.rust])
+        self.create_vacancy('SQL', [self.sql])
+        self.create_vacancy('Закрытая', [self.rust], is_active=False)
+
+        response = self.client.get('/api/vacancies/recommended/')
+        ids = [item['id'] for item in response.json()]
+        self.assertEqual(ids[0], rare.id)
+        self.assertEqual(set(ids[1:]), {v.id for v in common})
+
+        # Индекс обновляется при изменении навыков вакансии
+        rare.skills.set([self.sql])
+        response = self.client.get('/api/vacancies/recommended/')
+        self.assertNotIn(rare.id, [item['id'] for item in response.json()])
+
+    def test_changes_from_other_processes_are_picked_up(self):
+        from .recommendations import invalidate_skill_index
+        self.create_vacancy('Python', [self.python])
+        self.client.get('/api/vacancies/recommended/')
+
+        # bulk_create не вызывает сигналы - как изменение, сделанное в другом процессе
+        vacancy = Vacancy.objects.bulk_create([Vacancy(
+            employer=self.employer, title='Rust', description='Описание',
+            requirements='Требования', vacancy_type='work', location='Кампус'
+        )])[0]
+        VacancySkill.objects.bulk_create([VacancySkill(vacancy=vacancy, skill=self.rust)])
+        ids = [item['id'] for item in self.client.get('/api/vacancies/recommended/').json()]
+        self.assertNotIn(vacancy.id, ids)
+
+        # Другой процесс увеличил общую версию
+        invalidate_skill_index()
+        ids = [item['id'] for item in self.client.get('/api/vacancies/recommended/').json()]
+        self.assertEqual(ids[0], vacancy.id)
+
+    def test_only_students(self):
+        self.client.force_authenticate(self.employer.user)
+        response = self.client.get('/api/vacancies/recommended/')
+        self.assertEqual(response.status_code, 403)
+
+
+class CandidateRankingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer, (self.vacancy, other) = create_vacancies(2)
+        python, sql = Skill.objects.get(name='Python'), Skill.objects.get(name='SQL')
+
+        self.strong = create_student('strong')
+        self.strong.skills.set([python, sql])
+        self.weak = create_student('weak')
+        self.weak.skills.set([python])
+        self.reviewed = create_student('reviewed')
+        self.reviewed.skills.set([python])
+
+        self.applications = {}
+        for student in (self.weak, self.reviewed, self.strong):
+            self.applications[student.pk] = Application.objects.create(
+                student=student, vacancy=self.vacancy,
+                resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+            )
+        previous = Application.objects.create(
+            student=self.reviewed, vacancy=other,
+            resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+        )
+        Review.objects.create(application=previous, rating=5, from_role='employer')
+        self.client.force_authenticate(self.employer.user)
+
+    def ranked_students(self):
+        response = self.client.get(f'/api/applications/?vacancy={self.vacancy.id}&rank=match')
+        return [item['student']['user']['username'] for item in response.json()['results']]
+
+    def test_ranks_by_skills_and_reviews(self):
+        self.assertEqual(self.ranked_students(), ['strong', 'reviewed', 'weak'])
+
+        # Кэш сбрасывается при изменении навыков вакансии
+        self.vacancy.skills.set([Skill.objects.get(name='Python')])
+        self.assertEqual(self.ranked_students(), ['reviewed', 'weak', 'strong'])
+
+
+class VacancyResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        _, (self.vacancy,) = create_vacancies(1)
+
+    def test_anonymous_list_is_served_from_cache(self):
+        self.client.get('/api/vacancies/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/vacancies/')
+        self.assertEqual(len(response.json()['results']), 1)
+
+        # Изменение вакансии сбрасывает кэш
+        self.vacancy.title = 'Новое название'
+        self.vacancy.save()
+        response = self.client.get('/api/vacancies/')
+        self.assertEqual(response.json()['results'][0]['title'], 'Новое название')
+
+    def test_conditional_get_returns_304(self):
+        url = f'/api/vacancies/{self.vacancy.id}/'
+        response = self.client.get(url)
+        etag = response['ETag']
+        # updated_at не отражает связанные данные ответа
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Application.objects.create(
+            student=create_student(), vacancy=self.vacancy,
+            resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['applications_count'], 1)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+
+class ApplicationsCounterTest(TestCase):
+    def setUp(self):
+        _, (self.vacancy,) = create_vacancies(1)
+        self.students = [create_student(f'student{i}') for i in range(3)]
+        for student in self.students:
+            Application.objects.create(
+                student=student, vacancy=self.vacancy,
+                resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+            )
+
+    def test_counter_follows_creates_and_cascades(self):
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.applications_count, 3)
+
+        self.students[0].user.delete()
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.applications_count, 2)
+
+    def test_editing_stale_vacancy_keeps_count(self):
+        # Объект загружен до новой заявки, затем вакансию редактируют
+        stale = Vacancy.objects.get(pk=self.vacancy.pk)
+        Application.objects.create(
+            student=create_student('late'), vacancy=self.vacancy,
+            resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+        )
+        stale.title = 'Новое название'
+        stale.save()
+
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.title, 'Новое название')
+        self.assertEqual(self.vacancy.applications_count, 4)
+
+        client = APIClient()
+        client.force_authenticate(self.vacancy.employer.user)
+        response = client.patch(f'/api/vacancies/{self.vacancy.id}/', {'title': 'Через API'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.applications_count, 4)
+
+    def test_reconcile_command_repairs_drift(self):
+        Vacancy.objects.filter(pk=self.vacancy.pk).update(applications_count=42)
+        call_command('reconcile_applications_count', batch_size=1, stdout=StringIO())
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.applications_count, 3)
+
+    def test_reconcile_keeps_applications_created_during_batch(self):
+        Vacancy.objects.filter(pk=self.vacancy.pk).update(applications_count=42)
+        vacancy = self.vacancy
+
+        class ApplyWhileReconciling(StringIO):
+            # Заявка приходит между подсчетом пачки и ее исправлением
+            def write(self, text):
+                if text.startswith('Вакансия'):
+                    Application.objects.create(
+                        student=create_student('late'), vacancy=vacancy,
+                        resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+                    )
+                return super().write(text)
+
+        call_command('reconcile_applications_count', stdout=ApplyWhileReconciling())
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.applications_count, 4)
+
+
+class SparseFieldsetsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, vacancies = create_vacancies(3)
+        for i, vacancy in enumerate(vacancies):
+            Application.objects.create(
+                student=create_student(f'student{i}'), vacancy=vacancy,
+                resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+            )
+        self.client.force_authenticate(self.employer.user)
+
+    def test_shallow_mode_returns_ids(self):
+        response = self.client.get('/api/applications/?fields=id,status,vacancy,student&expand=')
+        item = response.json()['results'][0]
+        self.assertEqual(set(item), {'id', 'status', 'vacancy', 'student'})
+        self.assertIsInstance(item['vacancy'], int)
+        self.assertIsInstance(item['student'], int)
+
+    def test_trimmed_list_skips_joins_and_deferred_loads(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/applications/?fields=id,status')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'status'})
+        application_queries = [q['sql'] for q in queries if 'FROM "application"' in q['sql']]
+        # Одна выборка страницы без догрузки отложенных полей; JOIN только для фильтра по работодателю
+        self.assertEqual(len(application_queries), 1)
+        columns = application_queries[0].split(' FROM ')[0]
+        self.assertNotIn('"vacancy".', columns)
+        self.assertNotIn('"auth_user".', application_queries[0])
+
+    def test_review_field_with_fields_filter(self):
+        application = Application.objects.first()
+        Review.objects.create(application=application, rating=5, comment='Отлично')
+        response = self.client.get('/api/applications/?fields=id,review')
+        self.assertEqual(response.status_code, 200)
+        reviews = [item['review'] for item in response.json()['results']]
+        self.assertEqual(sum(review is not None for review in reviews), 1)
+
+    def test_partial_expand(self):
+        response = self.client.get('/api/applications/?fields=id,vacancy.title,vacancy.skills&expand=vacancy')
+        item = response.json()['results'][0]
+        self.assertEqual(set(item), {'id', 'vacancy'})
+        self.assertEqual(set(item['vacancy']), {'title', 'skills'})
+        self.assertIsInstance(item['vacancy']['skills'][0], int)
+
+    def test_full_list_has_constant_query_count(self):
+        # Профиль пользователя, заявки, навыки вакансий, навыки студентов
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/applications/')
+        item = response.json()['results'][0]
+        self.assertEqual(item['vacancy']['employer']['user']['username'], 'employer')
+
+
+class LoadTestHarnessTest(TestCase):
+    def test_seed_and_benchmark_every_route(self):
+        call_command(
+            'seed_load_data', students=6, employers=2, vacancies=8, applications=12,
+            notifications=20, batch_size=5, stdout=StringIO()
+        )
+        self.assertEqual(Application.objects.count(), 12)
+        self.assertEqual(Vacancy.objects.aggregate(total=Sum('applications_count'))['total'], 12)
+
+        from .benchmark import run_benchmark
+        report = run_benchmark(iterations=1, warmup=0, host='testserver')
+
+        self.assertEqual(report['uncovered_routes'], [])
+        for row in report['endpoints']:
+            self.assertTrue(all(int(code) < 500 for code in row['status_codes']), row)
+
+
+class NotificationOutboxTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, (self.vacancy,) = create_vacancies(1)
+        self.student = create_student()
+        self.application = Application.objects.create(
+            student=self.student, vacancy=self.vacancy,
+            resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+        )
+        self.client.force_authenticate(self.employer.user)
+
+    def test_status_change_is_delivered_by_worker(self):
+        response = self.client.patch(
+            f'/api/applications/{self.application.id}/update_status/', {'status': 'accepted'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(OutboxEvent.objects.filter(processed_at__isnull=True).count(), 1)
+
+        call_command('run_outbox_worker', once=True, stdout=StringIO())
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.user, self.student.user)
+        self.assertIn('Принято', notification.message)
+        self.assertFalse(OutboxEvent.objects.filter(processed_at__isnull=True).exists())
+
+    @override_settings(NOTIFICATION_BROKER={'BACKEND': 'api.realtime.InProcessBroker'})
+    def test_worker_warns_without_shared_broker_and_keeps_working(self):
+        from .outbox import enqueue
+        enqueue('application_status_changed', application_id=self.application.id, status='accepted')
+        with self.assertLogs('api.realtime', 'WARNING'):
+            call_command('run_outbox_worker', once=True, stdout=StringIO())
+        self.assertEqual(Notification.objects.filter(user=self.student.user).count(), 1)
+
+    def test_worker_publishes_through_shared_broker(self):
+        from unittest import mock
+        from .realtime import InProcessBroker
+
+        class SharedBroker(InProcessBroker):
+            shared = True
+
+            def __init__(self):
+                super().__init__()
+                self.published = []
+
+            def wants(self, user_id):
+                return True
+
+            def publish(self, user_id, event):
+                self.published.append((user_id, event['type']))
+
+        broker = SharedBroker()
+        self.client.patch(
+            f'/api/applications/{self.application.id}/update_status/', {'status': 'accepted'}, format='json'
+        )
+        with mock.patch('api.realtime._broker', broker), \
+                override_settings(NOTIFICATION_BROKER={'BACKEND': 'api.realtime.RedisBroker'}), \
+                self.captureOnCommitCallbacks(execute=True):
+            call_command('run_outbox_worker', once=True, stdout=StringIO())
+        self.assertEqual(broker.published, [(self.student.user.id, 'notification')])
+
+    def test_worker_expands_batch_in_constant_queries(self):
+        from .outbox import enqueue, process_batch
+        for status_value in ('reviewed', 'accepted', 'rejected'):
+            enqueue('application_status_changed', application_id=self.application.id, status=status_value)
+        enqueue('review_added', application_id=self.application.id)
+
+        UnreadNotificationCounter.objects.create(user=self.student.user)
+        # Savepoint, выборка событий, заявки, bulk_create, строки счетчиков и их UPDATE,
+        # отметка обработанных, release
+        with self.assertNumQueries(8):
+            self.assertEqual(process_batch(), 4)
+        self.assertEqual(Notification.objects.count(), 4)
+
+    def test_new_vacancy_fans_out_to_matching_students_in_chunks(self):
+        python, sql = Skill.objects.get(name='Python'), Skill.objects.get(name='SQL')
+        matching = [create_student(f'match{i}') for i in range(5)]
+        for i, student in enumerate(matching):
+            student.skills.set([python] if i % 2 else [python, sql])
+        create_student('other').skills.set([Skill.objects.get(name='Django')])
+
+        response = self.client.post('/api/vacancies/', {
+            'title': 'Аналитик', 'description': 'Описание', 'requirements': 'Требования',
+            'vacancy_type': 'work', 'location': 'Кампус', 'skill_ids': [python.id, sql.id]
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Notification.objects.exists())
+
+        from .outbox import process_fanout_chunk
+        self.assertEqual(process_fanout_chunk(chunk_size=2), 2)
+        self.assertEqual(process_fanout_chunk(chunk_size=2), 2)
+        self.assertEqual(process_fanout_chunk(chunk_size=2), 1)
+        self.assertIsNone(process_fanout_chunk(chunk_size=2))
+
+        recipients = set(Notification.objects.filter(notification_type='new_vacancy').values_list('user_id', flat=True))
+        self.assertEqual(recipients, {student.pk for student in matching})
+
+
+class NotificationStreamTest(TestCase):
+    def setUp(self):
+        self.student = create_student()
+        self.token = Token.objects.create(user=self.student.user)
+        Notification.objects.create(user=self.student.user, title='Старое', message='Текст')
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get('/api/notifications/stream/', {'token': 'wrong'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_page_subscribes_under_asgi(self):
+        response = await self.async_client.get('/notifications/')
+        self.assertIn(b'subscribeToNotifications', response.content)
+
+    def test_wsgi_gets_no_stream(self):
+        # Под WSGI поток не открывается, и страница уведомлений не подписывается
+        response = self.client.get('/api/notifications/stream/', {'token': self.token.key})
+        self.assertEqual(response.status_code, 204)
+        self.assertNotIn(b'subscribeToNotifications', self.client.get('/notifications/').content)
+
+    async def test_stream_sends_unread_count_and_new_notifications(self):
+        from asgiref.sync import sync_to_async
+        from .realtime import get_broker
+
+        response = await self.async_client.get('/api/notifications/stream/', {'token': self.token.key})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        try:
+            first = (await anext(events)).decode()
+            self.assertIn('event: unread_count', first)
+            self.assertIn('"count": 1', first)
+
+            self.assertTrue(get_broker().wants(self.student.user.id))
+            await sync_to_async(self.create_notification)()
+            second = (await anext(events)).decode()
+            self.assertIn('event: notification', second)
+            self.assertIn('Новое', second)
+        finally:
+            await events.aclose()
+
+    def create_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.student.user, title='Новое', message='Текст')
+
+
+class RedisBrokerTest(TestCase):
+    def test_listener_reconnects_after_connection_error(self):
+        from unittest import mock
+        from .realtime import RedisBroker
+
+        class Stop(BaseException):
+            pass
+
+        class FakePubSub:
+            def __init__(self, messages):
+                self.messages = messages
+
+            def psubscribe(self, pattern):
+                pass
+
+            def listen(self):
+                for message in self.messages:
+                    if isinstance(message, BaseException):
+                        raise message
+                    yield message
+
+            def close(self):
+                pass
+
+        message = {'channel': b'notifications:7', 'data': json.dumps({'type': 'unread_count', 'count': 2})}
+        connections = iter([FakePubSub([ConnectionError('обрыв')]), FakePubSub([message, Stop()])])
+        # Брокер без пакета redis: клиент подменяется, проверяется только цикл подписки
+        broker = RedisBroker.__new__(RedisBroker)
+        super(RedisBroker, broker).__init__()
+        broker._redis = mock.Mock(pubsub=lambda **options: next(connections))
+        broker._connection_errors = (ConnectionError,)
+
+        with mock.patch('api.realtime.time.sleep') as sleep, \
+                mock.patch.object(broker, 'deliver') as deliver, self.assertRaises(Stop):
+            broker._listen()
+        sleep.assert_called_once()
+        deliver.assert_called_once_with(7, {'type': 'unread_count', 'count': 2})
+
+
+class UnreadCounterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = create_student()
+        self.user = self.student.user
+        self.client.force_authenticate(self.user)
+
+    def unread(self):
+        return self.client.get('/api/notifications/unread_count/').data['count']
+
+    def test_counter_follows_creation_and_reads(self):
+        from .outbox import create_notifications
+        first = Notification.objects.create(user=self.user, title='1', message='Текст')
+        self.assertEqual(self.unread(), 1)
+
+        # После инициализации счетчик читается одним запросом без COUNT(*)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/notifications/unread_count/').data['count'], 1)
+
+        create_notifications([Notification(user=self.user, title=str(i), message='Текст') for i in range(3)])
+        self.assertEqual(self.unread(), 4)
+
+        self.client.post(f'/api/notifications/{first.id}/mark_as_read/')
+        self.client.post(f'/api/notifications/{first.id}/mark_as_read/')
+        self.assertEqual(self.unread(), 3)
+
+        self.client.post('/api/notifications/mark_all_as_read/')
+        self.assertEqual(self.unread(), 0)
+
+    def test_notification_between_count_and_row_creation_is_not_lost(self):
+        from unittest import mock
+        from . import counters
+        # Старое уведомление без строки счетчика (bulk_create обходит сигналы)
+        Notification.objects.bulk_create([Notification(user=self.user, title='0', message='Текст')])
+        count_unread = counters.count_unread
+
+        def count_then_notify(user_id):
+            count = count_unread(user_id)
+            Notification.objects.create(user=self.user, title='1', message='Текст')
+            return count
+
+        with mock.patch.object(counters, 'count_unread', side_effect=count_then_notify):
+            self.assertEqual(counters.get_unread_count(self.user.id), 2)
+        self.assertEqual(UnreadNotificationCounter.objects.get(user=self.user).unread_count, 2)
+
+    def test_user_with_unread_notifications_can_be_deleted(self):
+        for has_counter in (False, True):
+            with self.subTest(has_counter=has_counter):
+                user = create_student(f'deleted{has_counter}').user
+                Notification.objects.bulk_create([Notification(user=user, title='0', message='Текст')])
+                Notification.objects.create(user=user, title='1', message='Текст')
+                if not has_counter:
+                    UnreadNotificationCounter.objects.filter(user=user).delete()
+                user.delete()
+                connection.check_constraints()
+                self.assertFalse(UnreadNotificationCounter.objects.filter(user_id=user.id).exists())
+
+    def test_rebuild_command_repairs_drift(self):
+        Notification.objects.create(user=self.user, title='1', message='Текст')
+        self.assertEqual(self.unread(), 1)
+        UnreadNotificationCounter.objects.filter(user=self.user).update(unread_count=7)
+        # Без строки счетчика: bulk_create обходит сигналы
+        other = create_student('other').user
+        Notification.objects.bulk_create([Notification(user=other, title='0', message='Текст')])
+
+        call_command('rebuild_unread_counters', stdout=StringIO())
+        self.assertEqual(UnreadNotificationCounter.objects.get(user=self.user).unread_count, 1)
+        self.assertEqual(UnreadNotificationCounter.objects.get(user=other).unread_count, 1)
+
+    def test_rebuild_keeps_notifications_created_during_batch(self):
+        Notification.objects.create(user=self.user, title='1', message='Текст')
+        UnreadNotificationCounter.objects.filter(user=self.user).update(unread_count=7)
+        user = self.user
+
+        class NotifyWhileRebuilding(StringIO):
+            # Уведомление приходит между подсчетом пачки и ее исправлением
+            def write(self, text):
+                if text.startswith('Пользователь'):
+                    Notification.objects.create(user=user, title='2', message='Текст')
+                return super().write(text)
+
+        call_command('rebuild_unread_counters', stdout=NotifyWhileRebuilding())
+        self.assertEqual(UnreadNotificationCounter.objects.get(user=self.user).unread_count, 2)
+
+
+class BulkApplicationStatusTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, (self.vacancy,) = create_vacancies(1)
+        self.applications = [
+            Application.objects.create(
+                student=create_student(f'student{i}'), vacancy=self.vacancy,
+                resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+            )
+            for i in range(6)
+        ]
+        other_user = User.objects.create_user(username='other', password='pass12345')
+        other = EmployerProfile.objects.create(
+            user=other_user, first_name='Олег', last_name='Олегов',
+            company_name='Другое', department='ИТ', contact_person='Олег', phone='456'
+        )
+        _, (other_vacancy,) = create_vacancies(1, employer=other)
+        self.foreign = Application.objects.create(
+            student=create_student('stranger'), vacancy=other_vacancy,
+            resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+        )
+        self.client.force_authenticate(self.employer.user)
+
+    def bulk(self, ids, new_status='reviewed'):
+        return self.client.patch(
+            '/api/applications/bulk_status/', {'ids': ids, 'status': new_status}, format='json'
+        )
+
+    def test_updates_owned_applications_and_reports_each_item(self):
+        first, second = self.applications[:2]
+        second.status = 'reviewed'
+        second.save()
+
+        response = self.bulk([first.id, second.id, self.foreign.id, 999999])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(
+            [item['result'] for item in response.data['results']],
+            ['updated', 'unchanged', 'not_found', 'not_found']
+        )
+        first.refresh_from_db()
+        self.foreign.refresh_from_db()
+        self.assertEqual(first.status, 'reviewed')
+        self.assertEqual(self.foreign.status, 'pending')
+
+        # Уведомление получает только студент, чья заявка изменилась
+        from .outbox import process_batch
+        process_batch()
+        self.assertEqual(list(Notification.objects.values_list('user_id', flat=True)), [first.student_id])
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        # Пользователь загружается заново на каждый запрос, как при реальной аутентификации
+        self.client.force_authenticate(User.objects.get(pk=self.employer.pk))
+        # Профиль, savepoint, проверка владения, UPDATE, события outbox, release
+        with self.assertNumQueries(6):
+            self.bulk([application.id for application in self.applications[:2]], 'accepted')
+        self.client.force_authenticate(User.objects.get(pk=self.employer.pk))
+        with self.assertNumQueries(6):
+            self.bulk([application.id for application in self.applications[2:]], 'accepted')
+
+    def test_rejects_invalid_input(self):
+        self.assertEqual(self.bulk([self.applications[0].id], 'hired').status_code, 400)
+        self.assertEqual(self.bulk('1,2').status_code, 400)
+        self.client.force_authenticate(self.applications[0].student.user)
+        self.assertEqual(self.bulk([self.applications[0].id]).status_code, 403)
+
+
+class VacancyImportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, _ = create_vacancies(0)
+        self.client.force_authenticate(self.employer.user)
+
+    def upload(self, name, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        return self.client.post(
+            '/api/vacancies/import/', {'file': SimpleUploadedFile(name, content.encode())}, format='multipart'
+        )
+
+    def test_csv_import_creates_vacancies_skills_and_facets(self):
+        content = (
+            'title,description,requirements,vacancy_type,salary,location,category,skills\n'
+            'Лаборант,Описание,Требования,work,25000,Корпус Б,ИТ,Python;SQL\n'
+            'Стажер,Описание,Требования,internship,,Корпус Б,it,django\n'
+            'Ошибка,Описание,Требования,contract,,Корпус Б,Неизвестная,Python\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload('vacancies.csv', content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 4)
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'vacancy_type', 'category'})
+
+        lab = Vacancy.objects.get(title='Лаборант')
+        self.assertEqual(set(lab.skills.values_list('name', flat=True)), {'Python', 'SQL'})
+        self.assertEqual(VacancyFacet.objects.get(facet='location', value='Корпус Б').count, 2)
+        self.assertEqual(OutboxEvent.objects.filter(event_type='vacancy_created').count(), 2)
+        self.assertEqual(self.client.get('/api/vacancies/search/', {'q': 'лаборант'}).data[0]['id'], lab.id)
+
+    def test_jsonl_import_queries_do_not_grow_with_rows(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def import_rows(count):
+            lines = '\n'.join(json.dumps({
+                'title': f'Вакансия {i}', 'description': 'Описание', 'requirements': 'Требования',
+                'vacancy_type': 'work', 'location': 'Кампус', 'skills': ['Python', 'SQL']
+            }) for i in range(count))
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.upload('vacancies.jsonl', lines + '\n{broken').data['failed'], 1)
+            return len(queries)
+
+        # Первый импорт создает строки фасетов, дальше число запросов постоянно
+        import_rows(1)
+        self.assertEqual(import_rows(3), import_rows(30))
+        self.assertEqual(VacancySkill.objects.count(), 68)
+
+    def test_command_imports_file(self):
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8') as source:
+            source.write('{"title": "Ассистент", "description": "Описание", "requirements": "Требования", '
+                         '"vacancy_type": "work", "location": "Кампус"}\n')
+            source.flush()
+            call_command('import_vacancies', source.name, employer='employer', stdout=StringIO())
+        self.assertTrue(Vacancy.objects.filter(title='Ассистент', employer=self.employer).exists())
+
+
+class ApplicationExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, (self.vacancy,) = create_vacancies(1)
+        for i in range(5):
+            Application.objects.create(
+                student=create_student(f'student{i}'), vacancy=self.vacancy,
+                resume_url=f'https://example.com/cv/{i}', cover_letter='Сопроводительное'
+            )
+        other = create_student('=HYPERLINK')
+        other.first_name = '=HYPERLINK("x")'
+        other.save()
+        Application.objects.create(
+            student=other, vacancy=self.vacancy, resume_url='https://example.com/cv', cover_letter='Текст'
+        )
+        self.client.force_authenticate(self.employer.user)
+
+    def export(self, **params):
+        response = self.client.get('/api/applications/export/', params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8-sig')
+
+    def test_csv_export_streams_in_keyset_batches(self):
+        import csv
+        from .exporting import APPLICATION_EXPORT_COLUMNS, iter_rows
+
+        # Три пачки по 2 заявки и пустая завершающая выборка
+        with self.assertNumQueries(4):
+            self.assertEqual(len(list(iter_rows(Application.objects.all(), APPLICATION_EXPORT_COLUMNS, 2))), 6)
+
+        rows = list(csv.DictReader(self.export().splitlines()))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['vacancy_title'], 'Вакансия 0')
+        self.assertEqual(rows[0]['faculty'], 'ФИТ')
+        self.assertEqual(rows[-1]['first_name'], "'=HYPERLINK(\"x\")")
+
+    def test_jsonl_export_and_ownership(self):
+        rows = [json.loads(line) for line in self.export(export_format='jsonl').splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['status'], 'pending')
+
+        other_user = User.objects.create_user(username='other', password='pass12345')
+        EmployerProfile.objects.create(
+            user=other_user, first_name='Олег', last_name='Олегов',
+            company_name='Другое', department='ИТ', contact_person='Олег', phone='456'
+        )
+        self.client.force_authenticate(other_user)
+        self.assertEqual(self.export(export_format='jsonl'), '')
+
+
+class NotificationRetentionTest(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.user = create_student().user
+        now = timezone.now()
+        ages = [400, 400, 200, 200, 100, 100, 10, 1]
+        for i, age in enumerate(ages):
+            notification = Notification.objects.create(
+                user=self.user, title=f'{age}', message='Текст', is_read=i % 2 == 0
+            )
+            Notification.objects.filter(pk=notification.pk).update(created_at=now - timedelta(days=age))
+
+    def test_prunes_expired_notifications_in_batches(self):
+        from .counters import get_unread_count
+        self.assertEqual(get_unread_count(self.user.id), 4)
+
+        out = StringIO()
+        call_command('prune_notifications', read_days=90, unread_days=300, batch_size=3, sleep=0, stdout=out)
+
+        # Прочитанные старше 90 дней (400, 200, 100) и непрочитанное старше 300 дней (400)
+        remaining = list(Notification.objects.order_by('pk').values_list('title', 'is_read'))
+        self.assertEqual(remaining, [('200', False), ('100', False), ('10', True), ('1', False)])
+        self.assertEqual(get_unread_count(self.user.id), 3)
+        self.assertIn('прочитанных: 3, непрочитанных: 1', out.getvalue())
+
+    def test_read_between_batch_and_delete_is_not_uncounted_twice(self):
+        from unittest import mock
+        from .counters import get_unread_count, notifications_read
+        from .management.commands import prune_notifications
+        self.assertEqual(get_unread_count(self.user.id), 4)
+        expired_rows = prune_notifications.expired_rows
+        calls = []
+
+        def read_after_scan(rows, *cutoffs):
+            result = expired_rows(rows, *cutoffs)
+            if not calls:
+                # Как mark_as_read: старое непрочитанное читают до удаления пачки
+                if Notification.objects.filter(title='400', is_read=False).update(is_read=True):
+                    notifications_read(self.user.id)
+            calls.append(rows)
+            return result
+
+        with mock.patch.object(prune_notifications, 'expired_rows', side_effect=read_after_scan):
+            call_command('prune_notifications', read_days=90, unread_days=300, sleep=0, stdout=StringIO())
+        self.assertFalse(Notification.objects.filter(title='400').exists())
+        self.assertEqual(get_unread_count(self.user.id), 3)
+
+    def test_dry_run_keeps_rows(self):
+        call_command('prune_notifications', read_days=0, unread_days=0, dry_run=True, sleep=0, stdout=StringIO())
+        self.assertEqual(Notification.objects.count(), 8)
+
+
+@override_settings(TOKEN_AUTH_CACHE={'TTL': 300, 'CACHE': 'default', 'ALLOW_PROCESS_LOCAL': True})
+class TokenAuthCacheTest(TestCase):
+    def setUp(self):
+        from .authentication import token_cache
+        cache.clear()
+        token_cache.clear()
+        self.client = APIClient()
+        self.user = create_student().user
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_is_resolved_from_cache(self):
+        self.assertEqual(self.client.get('/api/notifications/unread_count/').status_code, 200)
+        # Остался только запрос счетчика: токен и пользователь берутся из кэша
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/notifications/unread_count/').status_code, 200)
+
+    def test_auth_is_token_on_hit_and_miss(self):
+        from rest_framework.test import APIRequestFactory
+        from .authentication import CachedTokenAuthentication
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        for _ in range(2):
+            user, auth = CachedTokenAuthentication().authenticate(request)
+            self.assertIsInstance(auth, Token)
+            self.assertEqual((auth.key, auth.user_id, auth.created), (self.token.key, user.pk, self.token.created))
+
+    def test_shared_cache_keeps_no_password(self):
+        self.client.get('/api/me/')
+        _, values, _ = cache.get(f'auth_token:{self.token.key}')
+        self.assertEqual(values, (self.user.id, self.user.username, True))
+
+    def test_process_lru_without_shared_cache(self):
+        from .authentication import token_cache
+        token_cache.clear()
+        with self.settings(TOKEN_AUTH_CACHE={'CACHE': 'default'}):
+            self.client.get('/api/notifications/unread_count/')
+            # LocMemCache не используется как общий: токен берется из LRU процесса
+            self.assertIsNone(cache.get(f'auth_token:{self.token.key}'))
+            with self.assertNumQueries(1):
+                self.client.get('/api/notifications/unread_count/')
+
+            self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+            self.assertEqual(self.client.get('/api/me/').status_code, 401)
+
+    def test_process_lru_is_bounded(self):
+        from .authentication import TokenCache
+        lru = TokenCache()
+        for key in 'abc':
+            lru.set(key, (0, (1, 'user', True), None), ttl=300, max_size=2)
+        self.assertIsNone(lru.get('a'))
+        self.assertIsNotNone(lru.get('c'))
+        lru.set('d', (0, (1, 'user', True), None), ttl=-1, max_size=2)
+        self.assertIsNone(lru.get('d'))
+
+    def test_logout_revokes_only_own_token(self):
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=create_student("other").user).key}')
+        self.assertEqual(self.client.get('/api/me/').status_code, 200)
+        self.assertEqual(other.get('/api/me/').status_code, 200)
+
+        self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/me/').status_code, 401)
+        # Кэш другого пользователя не сброшен
+        with self.assertNumQueries(1):
+            self.assertEqual(other.get('/api/me/').status_code, 200)
+
+    def test_password_change_and_deactivation_revoke_cached_token(self):
+        self.assertEqual(self.client.get('/api/me/').status_code, 200)
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertIsNone(cache.get(f'auth_token:{self.token.key}'))
+
+        self.assertEqual(self.client.get('/api/me/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/me/').status_code, 401)
+
+
+@override_settings(TOKEN_AUTH_CACHE={'TTL': 300, 'CACHE': 'default', 'ALLOW_PROCESS_LOCAL': True})
+class RoleResolverTest(TestCase):
+    def setUp(self):
+        from .authentication import token_cache
+        cache.clear()
+        token_cache.clear()
+        self.client = APIClient()
+        self.employer, _ = create_vacancies(0)
+        token = Token.objects.create(user=self.employer.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_role_and_profile_resolved_in_one_query(self):
+        self.client.get('/api/me/')
+        # Токен из кэша, оба профиля одним запросом - без отдельного промаха по student_profile
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/me/')
+        self.assertEqual(response.data['role'], 'employer')
+        self.assertEqual(response.data['employer_profile']['company_name'], 'Кампус')
+
+    def test_resolver_fills_relation_cache(self):
+        from .roles import resolve_profile
+        user = User.objects.get(pk=self.employer.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_profile(user), ('employer', self.employer))
+            self.assertFalse(hasattr(user, 'student_profile'))
+            self.assertEqual(user.employer_profile, self.employer)
+
+
+class DashboardTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer, self.vacancies = create_vacancies(6)
+        self.student = create_student()
+        self.student.skills.set(Skill.objects.all())
+
+    def apply(self, vacancies):
+        for vacancy in vacancies:
+            Application.objects.create(
+                student=self.student, vacancy=vacancy,
+                resume_url='https://example.com/cv', cover_letter='Сопроводительное'
+            )
+
+    def get_dashboard(self, user, **headers):
+        # Пользователь загружается заново, как при реальной аутентификации
+        self.client.force_authenticate(User.objects.get(pk=user.pk))
+        return self.client.get('/api/dashboard/', **headers)
+
+    def test_student_dashboard_uses_fixed_number_of_queries(self):
+        self.apply(self.vacancies[:1])
+        self.get_dashboard(self.student.user)
+        with CaptureQueriesContext(connection) as few:
+            response = self.get_dashboard(self.student.user)
+        self.assertEqual(response.data['user']['role'], 'student')
+        self.assertEqual(len(response.data['applications']), 1)
+        self.assertEqual(len(response.data['my_skills']), 3)
+
+        self.apply(self.vacancies[1:])
+        with CaptureQueriesContext(connection) as many:
+            response = self.get_dashboard(self.student.user)
+        self.assertEqual(len(response.data['applications']), 6)
+        self.assertEqual(len(many), len(few))
+
+    def test_employer_dashboard_and_etag(self):
+        response = self.get_dashboard(self.employer.user)
+        self.assertEqual(len(response.data['vacancies']), 6)
+        self.assertIn('categories', response.data)
+
+        etag = response['ETag']
+        self.assertEqual(self.get_dashboard(self.employer.user, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Notification.objects.create(user=self.employer.user, title='Новое', message='Текст')
+        response = self.get_dashboard(self.employer.user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unread_count'], 1)
+
+    def test_next_link_continues_in_list_endpoint(self):
+        from unittest import mock
+        with mock.patch('api.views_dashboard.DASHBOARD_LIMIT', 4):
+            response = self.get_dashboard(self.employer.user)
+        first = [vacancy['id'] for vacancy in response.data['vacancies']]
+        self.assertEqual(len(first), 4)
+        self.assertIn('my=true', response.data['vacancies_next'])
+
+        rest = self.client.get(response.data['vacancies_next']).json()
+        self.assertEqual(len(rest['results']), 2)
+        self.assertFalse(set(first) & {vacancy['id'] for vacancy in rest['results']})
+        self.assertIsNone(rest['next'])
+
+
+class ProvisionStudentsTest(TestCase):
+    def provision(self, rows, **options):
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8') as roster:
+            roster.write('\n'.join(json.dumps(row, ensure_ascii=False) for row in rows))
+            roster.flush()
+            out = StringIO()
+            call_command('provision_students', roster.name, stdout=out, **options)
+        return out.getvalue()
+
+    def roster(self, count):
+        return [{
+            'username': f'st{i}', 'email': f'st{i}@example.com', 'password': f'secret{i}',
+            'first_name': 'Анна', 'last_name': 'Смирнова', 'faculty': 'ФИТ', 'course': 1
+        } for i in range(count)]
+
+    def test_creates_users_profiles_and_tokens_and_resumes(self):
+        create_student('st0')
+        rows = self.roster(5) + [{**self.roster(1)[0], 'username': 'dup', 'email': 'ST1@example.com'}]
+        rows.append({'username': 'bad', 'email': 'bad'})
+
+        out = self.provision(rows, batch_size=2, workers=2)
+        self.assertIn('Создано студентов: 4. Уже существовали: 1. Ошибок: 2', out)
+        self.assertEqual(StudentProfile.objects.filter(user__username__startswith='st').count(), 5)
+        self.assertEqual(Token.objects.filter(user__username__startswith='st').count(), 4)
+        self.assertTrue(User.objects.get(username='st3').check_password('secret3'))
+
+        # Повторный запуск ничего не создает заново
+        out = self.provision(self.roster(5), workers=0)
+        self.assertIn('Создано студентов: 0. Уже существовали: 5', out)
+
+    def test_missing_password_is_unusable(self):
+        row = {key: value for key, value in self.roster(1)[0].items() if key != 'password'}
+        self.provision([row], workers=0)
+        self.assertFalse(User.objects.get(username='st0').has_usable_password())
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        from .metrics import registry
+        registry.reset()
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', password='password', is_staff=True)
+
+    def test_records_routes_and_requires_staff(self):
+        self.client.get('/api/categories/')
+        self.client.get('/api/categories/')
+        self.client.get('/api/no-such-route/')
+
+        self.assertIn(self.client.get('/api/metrics').status_code, (401, 403))
+        self.client.force_authenticate(create_student('student').user)
+        self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('api_request_duration_seconds_count{route="category-list",method="GET"} 2', body)
+        self.assertIn('api_requests_total{route="category-list",method="GET",status="200"} 2', body)
+        self.assertIn('api_requests_total{route="unmatched",method="GET",status="404"} 1', body)
+        self.assertIn('api_db_queries_total{route="category-list",method="GET"} ', body)
+
+    async def test_counts_queries_under_asgi(self):
+        from .metrics import QUERIES, registry
+        response = await self.async_client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        routes, _ = registry.snapshot()
+        self.assertGreater(routes[('category-list', 'GET')][QUERIES], 0)
+
+    def test_processes_are_merged_from_directory(self):
+        import tempfile
+        from unittest import mock
+        from .metrics import MetricsRegistry, registry
+        with tempfile.TemporaryDirectory() as directory, self.settings(METRICS={'DIR': directory}):
+            other = MetricsRegistry()
+            other.observe('category-list', 'GET', 200, 0.02, queries=3)
+            # Снимок другого процесса
+            with mock.patch('os.getpid', return_value=0):
+                other.flush(directory)
+            registry.observe('category-list', 'GET', 200, 0.5, queries=1)
+            routes, statuses = registry.collect()
+        stats = routes[('category-list', 'GET')]
+        self.assertEqual(sum(stats[:12]), 2)
+        self.assertEqual(stats[-3], 4)
+        self.assertEqual(statuses[('category-list', 'GET', 200)], 2)
+
+
+class QueryInspectionTest(TestCase):
+    def test_fingerprint_ignores_values_and_list_length(self):
+        from .queries import fingerprint
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            fingerprint('SELECT *  FROM t WHERE id IN (%s)\nLIMIT 5'),
+        )
+
+    def test_repeated_queries_are_attributed_to_serializer_field(self):
+        from .queries import QueryInspector
+        from .serializers import VacancySerializer
+        create_vacancies(6)
+        inspector = QueryInspector(stack_depth=4)
+        with connection.execute_wrapper(inspector):
+            VacancySerializer(Vacancy.objects.all(), many=True).data
+
+        repeated = inspector.repeated(threshold=5)
+        self.assertTrue(repeated)
+        field, stack = inspector.sources[repeated[0][0]]
+        self.assertRegex(field, r'Serializer\.\w+$')
+        self.assertTrue(any('api/tests.py' in line for line in stack))
+
+    def test_budget_is_enforced_per_action(self):
+        from unittest import mock
+        from .queries import QueryBudgetExceeded
+        from .views import CategoryViewSet
+        client = APIClient()
+        with mock.patch.object(CategoryViewSet, 'query_budget', {'list': 0}):
+            self.assertEqual(client.get('/api/categories/1/').status_code, 404)
+            with self.assertRaises(QueryBudgetExceeded):
+                client.get('/api/categories/')
+            with self.settings(QUERY_INSPECTION={'MODE': 'log'}), self.assertLogs('api.queries', 'WARNING'):
+                self.assertEqual(client.get('/api/categories/').status_code, 200)
+
+
+    async def test_budget_is_enforced_under_asgi(self):
+        from unittest import mock
+        from .queries import QueryBudgetExceeded
+        from .views import CategoryViewSet
+        with mock.patch.object(CategoryViewSet, 'query_budget', {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                await self.async_client.get('/api/categories/')
+
+
+@override_settings(DATABASE_REPLICAS={'ALIASES': ['replica'], 'PIN_SECONDS': 10})
+class ReplicaRoutingTest(TestCase):
+    # default и replica - две разные базы SQLite: по данным видно, откуда было чтение
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = create_student()
+        Category.objects.create(name='ИТ', slug='it')
+        Category.objects.using('replica').create(name='Наука', slug='science')
+
+    def test_safe_reads_go_to_replica(self):
+        response = self.client.get('/api/categories/')
+        self.assertEqual([item['slug'] for item in response.json()], ['science'])
+
+        # Остальные представления читают с основной БД
+        self.client.force_authenticate(self.student.user)
+        self.assertEqual(self.client.get('/api/me/').json()['username'], 'student')
+
+    def test_writer_is_pinned_to_primary(self):
+        notification = Notification.objects.create(
+            user=self.student.user, title='Заголовок', message='Текст', notification_type='system'
+        )
+        self.client.force_authenticate(User.objects.get(pk=self.student.user.pk))
+        self.assertEqual(self.client.get('/api/notifications/').json()['results'], [])
+
+        response = self.client.post(f'/api/notifications/{notification.pk}/mark_as_read/')
+        self.assertEqual(response.status_code, 200)
+        results = self.client.get('/api/notifications/').json()['results']
+        self.assertEqual([item['is_read'] for item in results], [True])
+
+        # Другие пользователи по-прежнему читают с реплики
+        self.client.force_authenticate(create_student('other').user)
+        self.assertEqual(
+            [item['slug'] for item in self.client.get('/api/categories/').json()], ['science']
+        )
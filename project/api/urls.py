@@ -2,6 +2,9 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 from . import views_auth
+from . import views_dashboard
+from . import views_metrics
+from . import views_stream
 
 router = DefaultRouter()
 router.register(r'vacancies', views.VacancyViewSet, basename='vacancy')
@@ -12,9 +15,14 @@ router.register(r'student-profiles', views.StudentProfileViewSet, basename='stud
 router.register(r'notifications', views.NotificationViewSet, basename='notification')
 
 urlpatterns = [
+    # До роутера: иначе 'stream' будет принят за pk уведомления
+    path('notifications/stream/', views_stream.notification_stream, name='notification-stream'),
     path('', include(router.urls)),
     path('me/', views_auth.current_user, name='current-user'),
+    path('dashboard/', views_dashboard.dashboard, name='dashboard'),
+    path('metrics', views_metrics.metrics, name='api-metrics'),
     path('login/', views_auth.login, name='api-login'),
+    path('logout/', views_auth.logout, name='api-logout'),
     path('register/', views_auth.register, name='api-register'),
     path('update-profile/', views_auth.update_profile, name='update-profile'),
 ]
\ No newline at end of file
@@ -1,20 +1,51 @@
+import codecs
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework.permissions import IsAuthenticated
 from .serializers import *
+from .serializers import requested_fields, is_field_requested, is_field_expanded
+from .pagination import (
+    VacancyCursorPagination, ApplicationCursorPagination, NotificationCursorPagination, CandidateRankPagination
+)
+from .search import search_vacancies
+from .facets import filter_vacancies, get_facet_counts
+from .recommendations import recommend_vacancies
+from .ranking import get_candidate_scores
+from .roles import get_employer_profile, get_student_profile
+from .counters import get_unread_count, notifications_read
+from .outbox import enqueue, enqueue_many
+from .importing import IMPORT_FORMATS, VACANCY_LIST_FIELDS, VacancyImporter, guess_format, read_rows
+from .exporting import APPLICATION_EXPORT_COLUMNS, EXPORT_FORMATS, csv_stream, iter_rows, jsonl_stream
+from .realtime import publish_unread_count
+from .replicas import ReplicaRoutingMixin
+from .caching import (
+    RESPONSE_TIMEOUT, invalidate_vacancy_cache, replica_may_be_stale, response_cache_key, vacancy_etag
+)
+
+
+# Максимум заявок в одном запросе bulk_status
+BULK_STATUS_LIMIT = 500
 
 
 class IsStudent(permissions.BasePermission):
     def has_permission(self, request, view):
-        return hasattr(request.user, 'student_profile')
+        return get_student_profile(request.user) is not None
 
 
 class IsEmployer(permissions.BasePermission):
     def has_permission(self, request, view):
-        return hasattr(request.user, 'employer_profile')
+        return get_employer_profile(request.user) is not None
 
 
 class IsEmployerOrReadOnly(permissions.BasePermission):
@@ -22,7 +53,7 @@ class IsEmployerOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        return hasattr(request.user, 'employer_profile')
+        return get_employer_profile(request.user) is not None
 
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
@@ -31,9 +62,13 @@ class IsEmployerOrReadOnly(permissions.BasePermission):
         return obj.employer.user == request.user
 
 
-class VacancyViewSet(viewsets.ModelViewSet):
+class VacancyViewSet(ReplicaRoutingMixin, viewsets.ModelViewSet):
     serializer_class = VacancySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsEmployerOrReadOnly]
+    pagination_class = VacancyCursorPagination
+    replica_actions = ('list', 'retrieve')
+    # Бюджет запросов к БД (api.queries): не зависит от числа строк в ответе
+    query_budget = {'list': 8, 'retrieve': 6, 'search': 6, 'facets': 4, 'recommended': 10}
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -41,7 +76,12 @@ class VacancyViewSet(viewsets.ModelViewSet):
         return VacancySerializer
 
     def get_queryset(self):
-        queryset = Vacancy.objects.all()
+        # Все вложенные данные сериализатора загружаются фиксированным числом запросов
+        queryset = Vacancy.objects.select_related(
+            'employer__user', 'category'
+        ).prefetch_related('skills')
+        if self.action == 'list':
+            queryset = filter_vacancies(queryset, self.request.query_params)
         user = self.request.user
         
         # Параметр ?my=true для работодателей (показать только мои вакансии)
@@ -52,23 +92,56 @@ class VacancyViewSet(viewsets.ModelViewSet):
             return queryset.filter(is_active=True)
         
         # Если работодатель запрашивает только свои вакансии
-        if my_vacancies and hasattr(user, 'employer_profile'):
-            return queryset.filter(employer=user.employer_profile)
+        employer_profile = get_employer_profile(user)
+        if my_vacancies and employer_profile is not None:
+            return queryset.filter(employer=employer_profile)
         
-        if hasattr(user, 'employer_profile'):
+        if employer_profile is not None:
             # Работодатели видят все свои вакансии
             if not self.request.query_params.get('show_all'):
                 return queryset.filter(
                     Q(is_active=True) | 
-                    Q(employer=user.employer_profile, is_active=False)
+                    Q(employer=employer_profile, is_active=False)
                 )
             return queryset
-        elif hasattr(user, 'student_profile'):
+        elif get_student_profile(user) is not None:
             # Студенты видят только активные вакансии
             return queryset.filter(is_active=True)
         else:
             return queryset
     
+    def get_cache_role(self):
+        # Ответ одинаков для всех анонимов и для всех студентов, работодатели не кэшируются
+        user = self.request.user
+        if not user.is_authenticated:
+            return 'anonymous'
+        if get_student_profile(user) is not None:
+            return 'student'
+        return None
+
+    def cached_response(self, request, build):
+        role = self.get_cache_role()
+        if role is None:
+            return build()
+
+        key = response_cache_key(request, role)
+        data = cache.get(key)
+        if data is None:
+            response = build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            if not replica_may_be_stale():
+                cache.set(key, data, RESPONSE_TIMEOUT)
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(VacancyViewSet, self).list(request, *args, **kwargs))
+
+    @method_decorator(condition(etag_func=vacancy_etag))
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(VacancyViewSet, self).retrieve(request, *args, **kwargs))
+
     def get_object(self):
         # Проверки доступа к неактивным вакансиям
         obj = super().get_object()
@@ -81,9 +154,9 @@ class VacancyViewSet(viewsets.ModelViewSet):
             return obj
         
         # Если вакансия неактивна:
-        if user.is_authenticated and hasattr(user, 'employer_profile'):
-            if obj.employer == user.employer_profile:
-                return obj
+        employer_profile = get_employer_profile(user)
+        if employer_profile is not None and obj.employer == employer_profile:
+            return obj
         
         if user.is_superuser:
             return obj
@@ -91,11 +164,75 @@ class VacancyViewSet(viewsets.ModelViewSet):
         raise Http404("Вакансия не найдена")
 
     def perform_create(self, serializer):
-        if hasattr(self.request.user, 'employer_profile'):
-            serializer.save(employer=self.request.user.employer_profile)
+        if get_employer_profile(self.request.user) is not None:
+            with transaction.atomic():
+                vacancy = serializer.save(employer=get_employer_profile(self.request.user))
+
+                # Студентов с подходящими навыками уведомит воркер outbox порциями
+                if vacancy.is_active:
+                    enqueue('vacancy_created', vacancy_id=vacancy.id)
         else:
             raise PermissionDenied("Только работодатели могут создавать вакансии")
 
+    # Массовый импорт вакансий из CSV или JSONL (поле file), обрабатывается потоково
+    @action(detail=False, methods=['post'], url_path='import',
+            permission_classes=[IsEmployer], parser_classes=[MultiPartParser])
+    def import_vacancies(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Файл не передан'}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('file_format') or guess_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response({'error': 'Поддерживаются форматы csv и jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Загруженный файл читается построчно, без загрузки целиком в память
+        lines = codecs.iterdecode(upload, 'utf-8-sig')
+        report = VacancyImporter(get_employer_profile(request.user)).run(read_rows(lines, file_format, VACANCY_LIST_FIELDS))
+        return Response(report)
+
+    # Количество активных вакансий по каждому значению фильтра
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        return Response(get_facet_counts())
+
+    # Полнотекстовый поиск по активным вакансиям: ?q=<запрос>&limit=<число>
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'Параметр q обязателен'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except (ValueError, TypeError):
+            limit = 20
+
+        vacancies = search_vacancies(self.get_queryset(), query, limit=limit)
+        serializer = self.get_serializer(vacancies, many=True)
+        return Response(serializer.data)
+
+    # Активные вакансии, подобранные по навыкам студента
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsStudent])
+    def recommended(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except (ValueError, TypeError):
+            limit = 20
+
+        skill_ids = StudentSkill.objects.filter(
+            student=get_student_profile(request.user)
+        ).values_list('skill_id', flat=True)
+        vacancies = recommend_vacancies(self.get_queryset(), list(skill_ids), limit=limit)
+
+        data = self.get_serializer(vacancies, many=True).data
+        for item, vacancy in zip(data, vacancies):
+            item['match_score'] = vacancy.match_score
+        return Response(data)
+
     @action(
     detail=True,
     methods=['post'],
@@ -104,13 +241,13 @@ class VacancyViewSet(viewsets.ModelViewSet):
     def apply(self, request, pk=None):
         vacancy = self.get_object()
         
-        if not hasattr(request.user, 'student_profile'):
+        if get_student_profile(request.user) is None:
             return Response(
                 {'error': 'Только студенты могут откликаться на вакансии'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        student_profile = request.user.student_profile
+        student_profile = get_student_profile(request.user)
         
         if Application.objects.filter(student=student_profile, vacancy=vacancy).exists():
             return Response(
@@ -130,6 +267,8 @@ class VacancyViewSet(viewsets.ModelViewSet):
                 cover_letter=serializer.validated_data['cover_letter'],
                 status='pending'
             )
+            # Счетчик увеличен сигналом через F(), перечитываем его для ответа
+            vacancy.refresh_from_db(fields=['applications_count'])
             
             return Response(
                 ApplicationSerializer(application).data,
@@ -142,33 +281,37 @@ class VacancyViewSet(viewsets.ModelViewSet):
 class StudentProfileViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = StudentProfileSerializer
+    query_budget = {'list': 6, 'retrieve': 6, 'my_skills': 4}
     
     def get_queryset(self):
-        if hasattr(self.request.user, 'student_profile'):
+        if get_student_profile(self.request.user) is not None:
             return StudentProfile.objects.filter(user=self.request.user)
         return StudentProfile.objects.none()
     
     @action(detail=False, methods=['get'])
     def my_skills(self, request):
-        if not hasattr(request.user, 'student_profile'):
+        if get_student_profile(request.user) is None:
             return Response(
                 {'error': 'У вас нет профиля студента'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        student_profile = request.user.student_profile
+        student_profile = get_student_profile(request.user)
         skills = student_profile.skills.all()
         serializer = SkillSerializer(skills, many=True)
         return Response(serializer.data)
 
 
-class ApplicationViewSet(viewsets.ModelViewSet):
+class ApplicationViewSet(ReplicaRoutingMixin, viewsets.ModelViewSet):
     serializer_class = ApplicationSerializer
-    permission_classes = [permissions.IsAuthenticated] 
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ApplicationCursorPagination
+    # Заявки читаются с основной БД, но изменения (update_status и др.) закрепляют за ней пользователя
+    query_budget = {'list': 12, 'retrieve': 6, 'export': 6}
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Application.objects.all()
+        queryset = self.trim_queryset(Application.objects.all())
         
         # Фильтрация по вакансии (если параметр передан)
         vacancy_id = self.request.query_params.get('vacancy')
@@ -180,32 +323,96 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 pass
         
         # Фильтруем по пользователю
-        if hasattr(user, 'student_profile'):
+        if get_student_profile(user) is not None:
             # Студент видит свои заявки
-            return queryset.filter(student=user.student_profile)
-        elif hasattr(user, 'employer_profile'):
+            return queryset.filter(student=get_student_profile(user))
+        elif get_employer_profile(user) is not None:
             # Работодатель видит заявки на свои вакансии
-            return queryset.filter(vacancy__employer=user.employer_profile)
+            return queryset.filter(vacancy__employer=get_employer_profile(user))
         
         return Application.objects.none()
     
+    def trim_queryset(self, queryset):
+        # Загружаем только то, что попадет в ответ с учетом ?fields= и ?expand=
+        request = self.request
+        if request.method not in permissions.SAFE_METHODS:
+            return queryset.select_related('student__user', 'vacancy__employer__user', 'vacancy__category')
+
+        def nested(path):
+            return is_field_requested(request, path) and is_field_expanded(request, path)
+
+        related = []
+        prefetch = []
+        if nested('student'):
+            related.append('student__user' if nested('student.user') else 'student')
+            if is_field_requested(request, 'student.skills'):
+                prefetch.append('student__skills')
+        if nested('vacancy'):
+            related.append('vacancy')
+            if nested('vacancy.employer'):
+                related.append('vacancy__employer__user' if nested('vacancy.employer.user') else 'vacancy__employer')
+            if nested('vacancy.category'):
+                related.append('vacancy__category')
+            if is_field_requested(request, 'vacancy.skills'):
+                prefetch.append('vacancy__skills')
+        fields = requested_fields(request)
+        if is_field_requested(request, 'review'):
+            # Обратная связь один-к-одному: даже id отзыва требует JOIN,
+            # но вместе с only() select_related для нее невозможен
+            (prefetch if fields is not None else related).append('review')
+        # select_related() без аргументов присоединил бы все внешние ключи
+        if related:
+            queryset = queryset.select_related(*related)
+        queryset = queryset.prefetch_related(*prefetch)
+
+        if fields is not None:
+            own_fields = {field.name for field in Application._meta.concrete_fields}
+            columns = {field.split('.')[0] for field in fields} & own_fields
+            # Поля связанных моделей из select_related загружаются целиком,
+            # applied_at нужен курсору пагинации
+            queryset = queryset.only('id', 'student', 'vacancy', 'applied_at', *columns)
+        return queryset
+
     def get_serializer_class(self):
         if self.action == 'create':
             return ApplicationCreateSerializer
         return ApplicationSerializer
+
+    def list(self, request, *args, **kwargs):
+        # ?vacancy=<id>&rank=match - кандидаты работодателя по убыванию оценки
+        vacancy_id = request.query_params.get('vacancy')
+        if (request.query_params.get('rank') == 'match' and vacancy_id and vacancy_id.isdigit()
+                and get_employer_profile(request.user) is not None):
+            return self.ranked_list(request, int(vacancy_id))
+        return super().list(request, *args, **kwargs)
+
+    def ranked_list(self, request, vacancy_id):
+        queryset = self.get_queryset()
+        visible_ids = set(queryset.values_list('id', flat=True))
+        scores = get_candidate_scores(vacancy_id)
+        ranked_ids = sorted(
+            (application_id for application_id in scores if application_id in visible_ids),
+            key=lambda application_id: (-scores[application_id], application_id)
+        )
+
+        paginator = CandidateRankPagination()
+        page_ids = paginator.paginate_queryset(ranked_ids, request, view=self)
+        applications = {application.id: application for application in queryset.filter(id__in=page_ids)}
+        page = [applications[application_id] for application_id in page_ids if application_id in applications]
+
+        data = self.get_serializer(page, many=True).data
+        for item, application in zip(data, page):
+            item['match_score'] = scores[application.id]
+        return paginator.get_paginated_response(data)
     
     def perform_create(self, serializer):
         # Автоматически устанавливаем студента при создании заявки
-        if hasattr(self.request.user, 'student_profile'):
-            application = serializer.save(student=self.request.user.student_profile)
-
-            # Создаем уведомление для работодателя
-            Notification.objects.create(
-                user=application.vacancy.employer.user,
-                title='Новая заявка',
-                message=f'Студент {application.student.first_name} откликнулся на вакансию "{application.vacancy.title}"',
-                notification_type='new_application'
-            )
+        if get_student_profile(self.request.user) is not None:
+            with transaction.atomic():
+                application = serializer.save(student=get_student_profile(self.request.user))
+
+                # Уведомление для работодателя создаст воркер outbox
+                enqueue('application_created', application_id=application.id)
         else:
             raise permissions.PermissionDenied("Только студенты могут создавать заявки")
     
@@ -214,13 +421,13 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         application = self.get_object()
         
         # Проверяем права - только работодатель владелец вакансии
-        if not hasattr(request.user, 'employer_profile'):
+        if get_employer_profile(request.user) is None:
             return Response(
                 {'error': 'Только работодатели могут изменять статус заявок'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        if application.vacancy.employer != request.user.employer_profile:
+        if application.vacancy.employer != get_employer_profile(request.user):
             return Response(
                 {'error': 'Вы не можете изменять статус этой заявки'},
                 status=status.HTTP_403_FORBIDDEN
@@ -229,15 +436,11 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         new_status = request.data.get('status')
         if new_status in ['pending', 'reviewed', 'accepted', 'rejected']:
             application.status = new_status
-            application.save()
-            
-            # Создаем уведомление для студента
-            Notification.objects.create(
-                user=application.student.user,
-                title='Обновление статуса заявки',
-                message=f'Статус вашей заявки на вакансию "{application.vacancy.title}" изменен на "{application.get_status_display()}"',
-                notification_type='application_update'
-            )
+            with transaction.atomic():
+                application.save()
+
+                # Уведомление для студента создаст воркер outbox
+                enqueue('application_status_changed', application_id=application.id, status=new_status)
             
             return Response(ApplicationSerializer(application).data)
         
@@ -246,18 +449,99 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    # Выгрузка заявок на вакансии работодателя: ?export_format=csv|jsonl&vacancy=<id>
+    @action(detail=False, methods=['get'], permission_classes=[IsEmployer])
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'error': 'Поддерживаются форматы csv и jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Application.objects.filter(vacancy__employer=get_employer_profile(request.user))
+        vacancy_id = request.query_params.get('vacancy')
+        if vacancy_id and vacancy_id.isdigit():
+            queryset = queryset.filter(vacancy_id=int(vacancy_id))
+
+        rows = iter_rows(queryset, APPLICATION_EXPORT_COLUMNS)
+        if export_format == 'csv':
+            content = csv_stream(rows, APPLICATION_EXPORT_COLUMNS)
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            content = jsonl_stream(rows, APPLICATION_EXPORT_COLUMNS)
+            content_type = 'application/x-ndjson; charset=utf-8'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="applications.{export_format}"'
+        return response
+
+    @action(detail=False, methods=['patch'])
+    def bulk_status(self, request):
+        # Массовая смена статуса: {"ids": [1, 2, 3], "status": "reviewed"}
+        if get_employer_profile(request.user) is None:
+            return Response(
+                {'error': 'Только работодатели могут изменять статус заявок'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        new_status = request.data.get('status')
+        if new_status not in dict(Application.STATUS_CHOICES):
+            return Response(
+                {'error': 'Неверный статус'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = request.data.get('ids')
+        if (not isinstance(ids, list) or not ids
+                or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)):
+            return Response(
+                {'error': 'ids должен быть непустым списком идентификаторов заявок'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > BULK_STATUS_LIMIT:
+            return Response(
+                {'error': f'Не больше {BULK_STATUS_LIMIT} заявок за запрос'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ids = list(dict.fromkeys(ids))
+
+        with transaction.atomic():
+            # Владение проверяется одним запросом: чужие заявки просто не попадают в выборку
+            current = dict(
+                Application.objects.select_for_update()
+                .filter(id__in=ids, vacancy__employer=get_employer_profile(request.user))
+                .values_list('id', 'status')
+            )
+            changed = [pk for pk in ids if pk in current and current[pk] != new_status]
+            if changed:
+                Application.objects.filter(id__in=changed).update(status=new_status, updated_at=timezone.now())
+
+                # Уведомления для студентов создаст воркер outbox одним bulk_create
+                enqueue_many('application_status_changed', [
+                    {'application_id': pk, 'status': new_status} for pk in changed
+                ])
+
+        if changed:
+            # update() не вызывает post_save: сбрасываем кэш вакансий, как это сделал бы сигнал
+            invalidate_vacancy_cache()
+
+        changed = set(changed)
+        results = [
+            {'id': pk, 'result': 'updated' if pk in changed else 'unchanged' if pk in current else 'not_found'}
+            for pk in ids
+        ]
+        return Response({'status': new_status, 'updated': len(changed), 'results': results})
+    
     @action(detail=True, methods=['post'])
     def add_review(self, request, pk=None):
         application = self.get_object()
         
         # Проверяем права - только работодатель владелец вакансии
-        if not hasattr(request.user, 'employer_profile'):
+        if get_employer_profile(request.user) is None:
             return Response(
                 {'error': 'Только работодатели могут оставлять отзывы'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        if application.vacancy.employer != request.user.employer_profile:
+        if application.vacancy.employer != get_employer_profile(request.user):
             return Response(
                 {'error': 'Вы не можете оставить отзыв на эту заявку'},
                 status=status.HTTP_403_FORBIDDEN
@@ -271,20 +555,16 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             )
         
         # Создаем отзыв
-        review = Review.objects.create(
-            application=application,
-            rating=request.data.get('rating'),
-            comment=request.data.get('comment', ''),
-            from_role='employer'
-        )
-        
-        # Создаем уведомление для студента
-        Notification.objects.create(
-            user=application.student.user,
-            title='Новый отзыв на вашу заявку',
-            message=f'Работодатель оставил отзыв на вашу заявку на вакансию "{application.vacancy.title}"',
-            notification_type='application_update'
-        )
+        with transaction.atomic():
+            review = Review.objects.create(
+                application=application,
+                rating=request.data.get('rating'),
+                comment=request.data.get('comment', ''),
+                from_role='employer'
+            )
+
+            # Уведомление для студента создаст воркер outbox
+            enqueue('review_added', application_id=application.id)
         
         return Response(ReviewSerializer(review).data, status=status.HTTP_201_CREATED)
     
@@ -314,40 +594,51 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         return Response(NotificationSerializer(notification).data)
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(ReplicaRoutingMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+    replica_actions = ('list',)
+    query_budget = {'list': 6, 'retrieve': 6, 'unread_count': 6}
     
-    # Пользователь видит только свои уведомления, отсортированные по дате
+    # Пользователь видит только свои уведомления, порядок по дате задает пагинация
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return Notification.objects.filter(user=self.request.user)
     
     # Получить количество непрочитанных уведомлений
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        count = Notification.objects.filter(user=request.user, is_read=False).count()
-        return Response({'count': count})
+        return Response({'count': get_unread_count(request.user.id)})
     
     # Пометить уведомление как прочитанное
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        # Условный UPDATE: счетчик уменьшается только при реальном переходе
+        if Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True):
+            notifications_read(request.user.id)
+            publish_unread_count(request.user.id, get_unread_count(request.user.id))
         return Response({'status': 'marked as read'})
     
     # Пометить все уведомления как прочитанные
     @action(detail=False, methods=['post'])
     def mark_all_as_read(self, request):
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        updated = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        if updated:
+            notifications_read(request.user.id, updated)
+            publish_unread_count(request.user.id, get_unread_count(request.user.id))
         return Response({'status': 'all marked as read'})
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(ReplicaRoutingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
+    replica_actions = ('list', 'retrieve')
     serializer_class = CategorySerializer
+    query_budget = 3
 
 
-class SkillViewSet(viewsets.ReadOnlyModelViewSet):
+class SkillViewSet(ReplicaRoutingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Skill.objects.all()
-    serializer_class = SkillSerializer
\ No newline at end of file
+    replica_actions = ('list', 'retrieve')
+    serializer_class = SkillSerializer
+    query_budget = 3
\ No newline at end of file
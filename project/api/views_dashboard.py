@@ -0,0 +1,97 @@
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .counters import get_unread_count
+from .queries import query_budget
+from .models import Application, Category, Skill, Vacancy
+from .pagination import ApplicationCursorPagination, VacancyCursorPagination
+from .roles import resolve_profile
+from .serializers import ApplicationSerializer, CategorySerializer, SkillSerializer, VacancySerializer
+from .views_auth import current_user_data
+
+
+# Сколько последних заявок/вакансий отдается для первой отрисовки кабинета
+DASHBOARD_LIMIT = 20
+
+
+def _first_page(request, queryset, pagination_class, route, **query):
+    """
+    Первая страница списка и ссылка на следующую страницу маршрута route:
+    курсор совместим с ним, так как порядок задает тот же класс пагинации
+    """
+    paginator = pagination_class()
+    paginator.page_size = DASHBOARD_LIMIT
+    page = paginator.paginate_queryset(queryset, request)
+    url = request.build_absolute_uri(reverse(route))
+    paginator.base_url = f'{url}?{urlencode(query)}' if query else url
+    return page, paginator.get_next_link()
+
+
+def _student_data(request, profile):
+    applications, next_url = _first_page(
+        request,
+        Application.objects.filter(student=profile)
+        .select_related('student__user', 'vacancy__employer__user', 'vacancy__category', 'review')
+        .prefetch_related('student__skills', 'vacancy__skills'),
+        ApplicationCursorPagination, 'application-list'
+    )
+    return {
+        'my_skills': SkillSerializer(profile.skills.all(), many=True).data,
+        'applications': ApplicationSerializer(applications, many=True).data,
+        'applications_next': next_url,
+    }
+
+
+def _employer_data(request, profile):
+    vacancies, next_url = _first_page(
+        request,
+        Vacancy.objects.filter(employer=profile)
+        .select_related('employer__user', 'category')
+        .prefetch_related('skills'),
+        VacancyCursorPagination, 'vacancy-list', my='true'
+    )
+    return {
+        'vacancies': VacancySerializer(vacancies, many=True).data,
+        'vacancies_next': next_url,
+        # Справочники для формы создания вакансии
+        'categories': CategorySerializer(Category.objects.all(), many=True).data,
+    }
+
+
+@query_budget(14)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard(request):
+    """
+    Все данные для первой отрисовки кабинета одним запросом:
+    профиль, заявки или вакансии, навыки и число непрочитанных уведомлений.
+    ETag считается по содержимому: неизменившийся кабинет отдается как 304.
+    """
+    role, profile = resolve_profile(request.user)
+    data = {
+        'user': current_user_data(request.user),
+        'unread_count': get_unread_count(request.user.id),
+        'skills': SkillSerializer(Skill.objects.all(), many=True).data,
+    }
+    if role == 'student':
+        data.update(_student_data(request, profile))
+    elif role == 'employer':
+        data.update(_employer_data(request, profile))
+
+    etag = '"%s"' % hashlib.md5(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    # Данные личные: кэшировать может только браузер, с обязательной проверкой
+    response['Cache-Control'] = 'private, no-cache'
+    return response
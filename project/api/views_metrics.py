@@ -0,0 +1,15 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from .metrics import registry, render_prometheus
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """Метрики запросов в текстовом формате Prometheus (только для персонала)"""
+    return HttpResponse(
+        render_prometheus(*registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
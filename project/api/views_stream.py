@@ -0,0 +1,69 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework.authtoken.models import Token
+
+from .counters import get_unread_count
+from .realtime import format_event, get_broker
+
+
+# Комментарий-пинг держит соединение открытым через прокси; в простое запросов к БД нет
+HEARTBEAT_INTERVAL = 15
+
+
+async def _authenticate(request):
+    # EventSource не умеет передавать заголовки, поэтому токен можно передать в ?token=
+    key = request.GET.get('token')
+    header = request.headers.get('Authorization', '')
+    if not key and header.startswith('Token '):
+        key = header[len('Token '):]
+
+    if key:
+        token = await Token.objects.select_related('user').filter(key=key).afirst()
+        if token is not None and token.user.is_active:
+            return token.user
+        return None
+
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+async def _event_stream(user_id):
+    # Подписываемся до подсчета, чтобы не пропустить события между ними
+    subscription = get_broker().subscribe(user_id)
+    try:
+        count = await sync_to_async(get_unread_count)(user_id)
+        yield format_event({'type': 'unread_count', 'count': count})
+        while True:
+            try:
+                event = await subscription.get(HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        subscription.close()
+
+
+async def notification_stream(request):
+    """
+    Server-sent events: новые уведомления и изменения счетчика непрочитанных.
+    Работает только через ASGI (core.asgi), заменяет опрос /api/notifications/unread_count/.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        # WSGI собирает асинхронный поток в список и держит поток воркера вечно;
+        # на 204 EventSource прекращает переподключения
+        return HttpResponse(status=204)
+
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({'error': 'Требуется авторизация'}, status=401)
+
+    response = StreamingHttpResponse(_event_stream(user.id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
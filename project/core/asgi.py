@@ -2,6 +2,9 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Server-sent events at /api/notifications/stream/ need this entry point
+(e.g. ``uvicorn core.asgi:application``); under WSGI the stream answers 204
+and the notifications page does not subscribe.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
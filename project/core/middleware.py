@@ -1,10 +1,27 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
 class DisableCSRFForAPI:
-    
+    # Поддерживает и async-цепочку, чтобы потоковые ответы под ASGI не уходили в поток
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.disable_csrf(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.disable_csrf(request)
+        return await self.get_response(request)
+
+    def disable_csrf(self, request):
         # Отключаем CSRF для всех API запросов
         if request.path.startswith('/api/'):
             setattr(request, '_dont_enforce_csrf_checks', True)
-        return self.get_response(request)
\ No newline at end of file
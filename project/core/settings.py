@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -26,6 +27,8 @@ SECRET_KEY = 'django-insecure-)!_dmryh^+t=m+i@tw*f^c!oyuz!2#opq@ladioly6s8^t5id=
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 ALLOWED_HOSTS = []
 
 
@@ -45,6 +48,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым: время ответа включает все остальные middleware
+    'api.metrics.MetricsMiddleware',
+    'api.queries.QueryInspectionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,6 +101,73 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения (api.replicas.ReplicaRouter). ALIASES - псевдонимы из DATABASES,
+# PIN_SECONDS - сколько после записи пользователь читает с default (больше задержки репликации)
+
+DATABASE_REPLICAS = {
+    'ALIASES': [],
+    'PIN_SECONDS': 10,
+}
+
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {**DATABASES['default'], 'HOST': os.environ['DB_REPLICA_HOST']}
+    DATABASE_REPLICAS['ALIASES'] = ['replica']
+
+if TESTING:
+    # В тестах реплику изображает отдельная база SQLite, маршрутизация включается в самих тестах
+    DATABASES['replica'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3'}
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Кэш ответов вакансий и оценок кандидатов инвалидируется сигналами; при нескольких
+# процессах нужен общий бэкенд (Redis/Memcached), иначе инвалидация видна только своему процессу
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'campus-jobs',
+    }
+}
+
+
+# Брокер событий для /api/notifications/stream/. InProcessBroker работает в пределах
+# одного процесса; для нескольких процессов: 'api.realtime.RedisBroker' с OPTIONS {'url': ...}.
+# Уведомления создает run_outbox_worker в отдельном процессе: без общего брокера он предупреждает,
+# что клиенты увидят их только при переподключении. ALLOW_PROCESS_LOCAL отключает предупреждение
+# (тесты: воркер и подписчики в одном процессе)
+
+NOTIFICATION_BROKER = {
+    'BACKEND': 'api.realtime.InProcessBroker',
+    'ALLOW_PROCESS_LOCAL': TESTING,
+}
+
+# Срок хранения уведомлений в днях (применяется командой prune_notifications)
+
+NOTIFICATION_RETENTION = {
+    'READ_DAYS': 90,
+    'UNREAD_DAYS': 365,
+}
+
+# Метрики запросов (/api/metrics). При нескольких процессах укажите общий
+# каталог DIR: каждый процесс раз в FLUSH_INTERVAL секунд сбрасывает туда свой снимок
+
+METRICS = {
+    'DIR': os.environ.get('METRICS_DIR'),
+    'FLUSH_INTERVAL': 5,
+}
+
+# Поиск N+1 и бюджеты запросов представлений (api.queries). В тестах превышение
+# бюджета - ошибка, на staging достаточно QUERY_INSPECTION_MODE=log
+
+QUERY_INSPECTION = {
+    'MODE': 'raise' if TESTING else os.environ.get('QUERY_INSPECTION_MODE', 'log' if DEBUG else 'off'),
+    'REPEAT_THRESHOLD': 5,
+    'STACK_DEPTH': 4,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -114,15 +187,41 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Наборы классов аутентификации API. В production нет BasicAuthentication:
+# она проверяет пароль (PBKDF2) на каждом запросе
+
+AUTHENTICATION_PROFILES = {
+    'development': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'api.authentication.CachedTokenAuthentication',
+    ],
+    'production': [
+        'api.authentication.CachedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+}
+AUTH_PROFILE = os.environ.get('AUTH_PROFILE', 'development')
+
+# Кэш токенов: LRU процесса (MAX_SIZE записей, TTL секунд), хранит только id, username и is_active.
+# Без общего кэша отзыв (выход, смена пароля) сразу действует в своем процессе, в остальных - через TTL.
+# Для нескольких процессов укажите в CACHE псевдоним общего кэша из CACHES, например
+#   CACHES['tokens'] = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://...'}
+#   TOKEN_AUTH_CACHE['CACHE'] = 'tokens'
+# тогда отзыв мгновенный во всех процессах. Процессный кэш (LocMemCache) в CACHE игнорируется,
+# кроме ALLOW_PROCESS_LOCAL (тесты)
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 300,
+    'CACHE': None,
+    'ALLOW_PROCESS_LOCAL': False,
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': AUTHENTICATION_PROFILES[AUTH_PROFILE],
     'EXCEPTION_HANDLER': 'api.exceptions.custom_exception_handler',
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
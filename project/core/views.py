@@ -1,3 +1,4 @@
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render
 
 # Главная страница
@@ -31,5 +32,6 @@ def login_view(request):
 def register_view(request):
     return render(request, 'register.html')
 
+# Поток уведомлений (server-sent events) доступен только при запуске через ASGI
 def notifications_view(request):
-    return render(request, 'notifications.html')
\ No newline at end of file
+    return render(request, 'notifications.html', {'realtime': isinstance(request, ASGIRequest)})
\ No newline at end of file
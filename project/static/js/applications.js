@@ -51,8 +51,8 @@ async function loadApplications() {
             throw new Error(`Ошибка загрузки заявок: ${response.status}`);
         }
         
-        const applications = await response.json();
-        displayApplications(applications, vacancyId);
+        const data = await response.json();
+        showApplicationsPage(data.results || data, data.next, vacancyId);
         
     } catch (error) {
         console.error('Ошибка загрузки заявок:', error);
@@ -68,6 +68,16 @@ async function loadApplications() {
     }
 }
 
+// Заявки всех загруженных страниц
+let loadedApplications = [];
+
+function showApplicationsPage(applications, next, vacancyId, append = false) {
+    loadedApplications = append ? loadedApplications.concat(applications) : applications;
+    displayApplications(loadedApplications, vacancyId);
+    appendLoadMoreButton(document.getElementById('applications-list'), next,
+        (items, nextUrl) => showApplicationsPage(items, nextUrl, vacancyId, true));
+}
+
 // Отображение заявок
 function displayApplications(applications, vacancyId) {
     const container = document.getElementById('applications-list');
@@ -92,7 +102,7 @@ function displayApplications(applications, vacancyId) {
     let html = `
         <div class="d-flex justify-content-between align-items-center mb-3">
             <div>
-                <span class="badge bg-primary">${applications.length} заявок</span>
+                <span class="badge bg-primary">Показано заявок: ${applications.length}</span>
                 ${vacancyId ? '<span class="badge bg-info ms-2">Фильтр по вакансии</span>' : ''}
             </div>
             <a href="/employer-dashboard/" class="btn btn-sm btn-outline-secondary">
@@ -130,6 +130,10 @@ function showUserInfo(user) {
 
 // Функция выхода
 function logout() {
+    // Токен отзывается на сервере; ответ не ждем
+    if (localStorage.getItem(TOKEN_KEY)) {
+        fetch(`${API_BASE_URL}/logout/`, { method: 'POST', headers: getAuthHeaders(), keepalive: true }).catch(() => {});
+    }
     localStorage.removeItem(TOKEN_KEY);
     localStorage.removeItem('user_info');
     showSuccess('Вы вышли из системы');
@@ -165,6 +169,30 @@ function getAuthHeaders() {
     return headers;
 }
 
+// Постраничные списки API: кнопка "Показать еще" загружает страницу по ссылке next
+// и передает ее элементы в onPage(items, next)
+function appendLoadMoreButton(container, nextUrl, onPage) {
+    if (!container || !nextUrl) return;
+    
+    const button = document.createElement('button');
+    button.className = 'btn btn-outline-secondary w-100 mt-2';
+    button.textContent = 'Показать еще';
+    button.addEventListener('click', async () => {
+        button.disabled = true;
+        try {
+            const response = await fetch(nextUrl, { headers: getAuthHeaders() });
+            if (!response.ok) throw new Error(`Ошибка загрузки: ${response.status}`);
+            const data = await response.json();
+            button.remove();
+            onPage(data.results, data.next);
+        } catch (error) {
+            console.error('Ошибка загрузки следующей страницы:', error);
+            button.disabled = false;
+        }
+    });
+    container.appendChild(button);
+}
+
 // Проверка роли пользователя
 function getUserRole() {
     const userInfo = JSON.parse(localStorage.getItem('user_info') || '{}');
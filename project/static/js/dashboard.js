@@ -11,62 +11,30 @@ async function loadStudentDashboard() {
             return;
         }
         
-        // Загружаем профиль
-        const profileResponse = await fetch(`${API_BASE_URL}/me/`, {
+        // Профиль, навыки и заявки одним запросом
+        const response = await fetch(`${API_BASE_URL}/dashboard/`, {
             headers: getAuthHeaders()
         });
         
-        if (profileResponse.status === 401) {
+        if (response.status === 401) {
             localStorage.removeItem('auth_token');
             localStorage.removeItem('user_info');
             window.location.href = '/login/';
             return;
         }
         
-        let userData = {};
-        if (profileResponse.ok) {
-            userData = await profileResponse.json();
-            displayStudentProfile(userData);
-        } else {
-            const userInfo = JSON.parse(localStorage.getItem('user_info') || '{}');
-            userData = userInfo;
-            displayStudentProfile(userData);
-        }
-        
-        // Загружаем навыки через новый эндпоинт
-        if (userData.role === 'student') {
-            const skillsResponse = await fetch(`${API_BASE_URL}/student-profiles/my_skills/`, {
-                headers: getAuthHeaders()
-            });
-            
-            if (skillsResponse.ok) {
-                const skills = await skillsResponse.json();
-                displayStudentSkills(skills);
-            } else {
-                // Если эндпоинта нет, покажем заглушку
-                displayStudentSkills([]);
-            }
-        }
-        
-        // Загружаем заявки
-        const applicationsResponse = await fetch(`${API_BASE_URL}/applications/`, {
-            headers: getAuthHeaders()
-        });
-        
-        if (applicationsResponse.ok) {
-            const applications = await applicationsResponse.json();
-            displayStudentApplications(applications);
-        } else if (applicationsResponse.status === 403) {
-            document.getElementById('student-applications').innerHTML = `
-                <div class="alert alert-warning">
-                    Нет доступа к заявкам. Возможно, у вас не заполнен профиль студента.
-                </div>
-            `;
-        } else {
-            console.log('Не удалось загрузить заявки:', applicationsResponse.status);
+        if (!response.ok) {
+            console.log('Не удалось загрузить кабинет:', response.status);
+            displayStudentProfile(JSON.parse(localStorage.getItem('user_info') || '{}'));
             displayStudentApplications([]);
+            return;
         }
         
+        const data = await response.json();
+        displayStudentProfile(data.user);
+        displayStudentSkills(data.my_skills || []);
+        showStudentApplications(data.applications || [], data.applications_next);
+        
     } catch (error) {
         console.error('Ошибка загрузки кабинета:', error);
         const profileDiv = document.getElementById('student-profile') || document.getElementById('main-content');
@@ -169,6 +137,16 @@ function displayStudentSkills(skills) {
     skillsDiv.innerHTML = html;
 }
 
+// Кабинет отдает первую страницу и ссылку next на продолжение в /applications/
+let loadedStudentApplications = [];
+
+function showStudentApplications(applications, next, append = false) {
+    loadedStudentApplications = append ? loadedStudentApplications.concat(applications) : applications;
+    displayStudentApplications(loadedStudentApplications);
+    appendLoadMoreButton(document.getElementById('student-applications'), next,
+        (items, nextUrl) => showStudentApplications(items, nextUrl, true));
+}
+
 // Отображение заявок студента
 function displayStudentApplications(applications) {
     const container = document.getElementById('student-applications');
@@ -243,48 +221,21 @@ async function loadEmployerDashboard() {
             return;
         }
         
-        // Загружаем профиль
-        const profileResponse = await fetch(`${API_BASE_URL}/me/`, {
+        // Профиль и вакансии работодателя одним запросом
+        const response = await fetch(`${API_BASE_URL}/dashboard/`, {
             headers: getAuthHeaders()
         });
         
-        let userData = {};
-        if (profileResponse.ok) {
-            userData = await profileResponse.json();
-            displayEmployerProfile(userData);
-        } else {
-            const userInfo = JSON.parse(localStorage.getItem('user_info') || '{}');
-            userData = userInfo;
-            displayEmployerProfile(userData);
+        if (!response.ok) {
+            console.log('Не удалось загрузить кабинет:', response.status);
+            displayEmployerProfile(JSON.parse(localStorage.getItem('user_info') || '{}'));
+            displayEmployerVacancies([]);
+            return;
         }
         
-        // Загружаем свои вакансии работодателя
-        const vacanciesResponse = await fetch(`${API_BASE_URL}/vacancies/?my=true`, {
-            headers: getAuthHeaders()
-        });
-
-        if (vacanciesResponse.ok) {
-            const vacancies = await vacanciesResponse.json();
-            displayEmployerVacancies(vacancies);
-        } else {
-            // Если параметр my=true не работает, фильтруем на клиенте
-            const allVacanciesResponse = await fetch(`${API_BASE_URL}/vacancies/`, {
-                headers: getAuthHeaders()
-            });
-            
-            if (allVacanciesResponse.ok) {
-                const allVacancies = await allVacanciesResponse.json();
-                const userInfo = JSON.parse(localStorage.getItem('user_info') || '{}');
-                
-                // Фильтруем вакансии текущего работодателя
-                const myVacancies = allVacancies.filter(v => 
-                    v.employer && v.employer.user && v.employer.user.username === userInfo.username
-                );
-                displayEmployerVacancies(myVacancies);
-            } else {
-                displayEmployerVacancies([]);
-            }
-        }
+        const data = await response.json();
+        displayEmployerProfile(data.user);
+        showEmployerVacancies(data.vacancies || [], data.vacancies_next);
         
     } catch (error) {
         console.error('Ошибка загрузки кабинета:', error);
@@ -332,6 +283,16 @@ function displayEmployerProfile(user) {
     }
 }
 
+// Продолжение списка - в /vacancies/?my=true
+let loadedEmployerVacancies = [];
+
+function showEmployerVacancies(vacancies, next, append = false) {
+    loadedEmployerVacancies = append ? loadedEmployerVacancies.concat(vacancies) : vacancies;
+    displayEmployerVacancies(loadedEmployerVacancies);
+    appendLoadMoreButton(document.getElementById('employer-vacancies'), next,
+        (items, nextUrl) => showEmployerVacancies(items, nextUrl, true));
+}
+
 // Отображение вакансий работодателя
 function displayEmployerVacancies(vacancies) {
     const container = document.getElementById('employer-vacancies');
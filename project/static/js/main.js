@@ -19,20 +19,31 @@ async function loadVacancies(filters = {}) {
         const response = await fetch(url);
         if (!response.ok) throw new Error('Ошибка загрузки вакансий');
         
-        const vacancies = await response.json();
-        displayVacancies(vacancies);
-        
-        // Показываем количество результатов
-        const resultsInfo = document.getElementById('results-info');
-        if (resultsInfo) {
-            resultsInfo.textContent = `Найдено вакансий: ${vacancies.length}`;
-        }
+        const data = await response.json();
+        // Ответ постраничный: элементы лежат в results, следующая страница - по ссылке next
+        showVacanciesPage(data.results || data, data.next);
         
     } catch (error) {
         showError('Не удалось загрузить вакансии');
     }
 }
 
+// Вакансии всех загруженных страниц
+let loadedVacancies = [];
+
+function showVacanciesPage(vacancies, next, append = false) {
+    loadedVacancies = append ? loadedVacancies.concat(vacancies) : vacancies;
+    displayVacancies(loadedVacancies);
+    appendLoadMoreButton(document.getElementById('vacancies-container'), next,
+        (items, nextUrl) => showVacanciesPage(items, nextUrl, true));
+    
+    // Общее число не считается (курсорная пагинация): показываем, сколько загружено
+    const resultsInfo = document.getElementById('results-info');
+    if (resultsInfo) {
+        resultsInfo.textContent = `Показано вакансий: ${loadedVacancies.length}${next ? ' (есть еще)' : ''}`;
+    }
+}
+
 document.addEventListener('DOMContentLoaded', function() {
     checkAuth();
     displaySearchFilters();
@@ -12,10 +12,9 @@ async function loadNotifications() {
         });
         
         if (response.ok) {
-            const notifications = await response.json();
-            console.log('Уведомления загружены:', notifications.length);
-            displayNotifications(notifications);
-            updateNotificationBadge(notifications);
+            const data = await response.json();
+            showNotificationsPage(data.results || data, data.next);
+            updateNotificationBadge();
         } else if (response.status === 404) {
             console.warn('Эндпоинт уведомлений не найден (404)');
             // Скрываем компонент уведомлений
@@ -30,6 +29,16 @@ async function loadNotifications() {
     }
 }
 
+// Уведомления всех загруженных страниц
+let loadedNotifications = [];
+
+function showNotificationsPage(notifications, next, append = false) {
+    loadedNotifications = append ? loadedNotifications.concat(notifications) : notifications;
+    displayNotifications(loadedNotifications);
+    appendLoadMoreButton(document.getElementById('notifications-list'), next,
+        (items, nextUrl) => showNotificationsPage(items, nextUrl, true));
+}
+
 // Отобразить уведомления
 function displayNotifications(notifications) {
     const container = document.getElementById('notifications-list');
@@ -172,4 +181,38 @@ async function updateNotificationBadge() {
     } catch (error) {
         console.error('Ошибка обновления бейджа:', error);
     }
-}
\ No newline at end of file
+}
+
+// Подписка на поток уведомлений (server-sent events) вместо периодического опроса
+let notificationStream = null;
+
+function subscribeToNotifications() {
+    const token = localStorage.getItem('auth_token');
+    if (!token || !window.EventSource || notificationStream) return;
+
+    notificationStream = new EventSource(`${API_BASE_URL}/notifications/stream/?token=${encodeURIComponent(token)}`);
+
+    notificationStream.addEventListener('unread_count', event => {
+        const data = JSON.parse(event.data);
+        const badge = document.getElementById('notification-badge');
+        if (badge) {
+            if (data.count > 0) {
+                badge.textContent = data.count;
+                badge.style.display = 'inline';
+            } else {
+                badge.style.display = 'none';
+            }
+        }
+    });
+
+    notificationStream.addEventListener('notification', () => {
+        loadNotifications();
+    });
+
+    notificationStream.onerror = () => {
+        // EventSource переподключается сам; при закрытии (например, 401) прекращаем попытки
+        if (notificationStream.readyState === EventSource.CLOSED) {
+            notificationStream = null;
+        }
+    };
+}